@@ -12,9 +12,6 @@ import random
 import hashlib
 import time
 import struct
-from Crypto.Cipher import AES
-import xml.etree.cElementTree as ET
-import socket
 
 import ierror
 
@@ -74,6 +71,8 @@ class XMLParse:
         @param xmltext: 待提取的xml字符串
         @return: 提取出的加密消息字符串
         """
+        # 用到时才导入；Python 3 的 ElementTree 自带 C 加速（cElementTree 在 3.9 起已移除）
+        import xml.etree.ElementTree as ET
         try:
             xml_tree = ET.fromstring(xmltext)
             encrypt = xml_tree.find("Encrypt")
@@ -105,6 +104,20 @@ class PKCS7Encoder():
     """提供基于PKCS7算法的加解密接口"""
 
     block_size = 32
+    # 预先生成的补位字节，按补位长度索引
+    PADDINGS = [bytes([n]) * n for n in range(block_size + 1)]
+
+    def pad_amount(self, text_length):
+        """计算需要填充的位数（1 ~ block_size）"""
+        return self.block_size - (text_length % self.block_size)
+
+    def pad_into(self, buf, text_length):
+        """在预分配的缓冲区 buf 中，从 text_length 处写入补位字节
+        @return: 补位后的总长度
+        """
+        amount_to_pad = self.pad_amount(text_length)
+        buf[text_length:text_length + amount_to_pad] = self.PADDINGS[amount_to_pad]
+        return text_length + amount_to_pad
 
     def encode(self, text):
         """ 对需要加密的明文进行填充补位
@@ -112,53 +125,79 @@ class PKCS7Encoder():
         @return: 补齐明文字符串
         """
         text_length = len(text)
-        # 计算需要填充的位数
-        amount_to_pad = self.block_size - (text_length % self.block_size)
-        if amount_to_pad == 0:
-            amount_to_pad = self.block_size
-        # 获得补位所用的字符
-        pad = chr(amount_to_pad)
-        return text + (pad * amount_to_pad).encode()
+        buf = bytearray(text_length + self.pad_amount(text_length))
+        buf[:text_length] = text
+        self.pad_into(buf, text_length)
+        return bytes(buf)
 
     def decode(self, decrypted):
         """删除解密后明文的补位字符
         @param decrypted: 解密后的明文
         @return: 删除补位字符后的明文
         """
-        pad = ord(decrypted[-1])
+        pad = decrypted[-1]
+        if isinstance(pad, str):
+            pad = ord(pad)
         if pad < 1 or pad > 32:
             pad = 0
-        return decrypted[:-pad]
+        return decrypted[:len(decrypted) - pad]
 
 
 class Prpcrypt(object):
     """提供接收和推送给企业微信消息的加解密接口"""
 
+    # 明文结构: 16位随机字符串 + 4字节网络序长度 + 消息体 + receiveid
+    RANDOM_LEN = 16
+    HEADER_LEN = RANDOM_LEN + 4
+    LENGTH = struct.Struct("!I")
+
     def __init__(self, key):
+        # pycryptodome 导入约 50 ms，构造加解密对象时才导入，import 本模块不加载
+        from Crypto.Cipher import AES
+        self.aes = AES
 
         # self.key = base64.b64decode(key+"=")
         self.key = key
         # 设置加解密模式为AES的CBC模式
         self.mode = AES.MODE_CBC
+        # IV 固定取 key 的前16位，构造时计算一次
+        self.iv = key[:16]
+        self.pkcs7 = PKCS7Encoder()
+
+    def new_cipher(self):
+        """创建 AES-CBC 加解密器
+        CBC 加解密器带有链式状态，只能用于一条消息，不能跨调用或跨线程复用；
+        这里只复用已计算好的 key/iv/mode
+        """
+        return self.aes.new(self.key, self.mode, self.iv)
 
     def encrypt(self, text, receiveid):
         """对明文进行加密
         @param text: 需要加密的明文
         @return: 加密得到的字符串
         """
-        # 16位随机字符串添加到明文开头
         text = text.encode()
-        text = self.get_random_str() + struct.pack("I", socket.htonl(len(text))) + text + receiveid.encode()
+        receiveid = receiveid.encode()
+        text_length = self.HEADER_LEN + len(text) + len(receiveid)
+        # 一次性分配补位后的完整缓冲区，各段直接写入，加密也在原缓冲区内完成
+        buf = bytearray(text_length + self.pkcs7.pad_amount(text_length))
+        # 16位随机字符串添加到明文开头
+        buf[:self.RANDOM_LEN] = self.get_random_str()
+        self.LENGTH.pack_into(buf, self.RANDOM_LEN, len(text))
+        body_end = self.HEADER_LEN + len(text)
+        buf[self.HEADER_LEN:body_end] = text
+        buf[body_end:text_length] = receiveid
+        # 明文已复制进缓冲区，提前释放，降低 base64 阶段的内存峰值
+        del text
 
         # 使用自定义的填充方式对明文进行补位填充
-        pkcs7 = PKCS7Encoder()
-        text = pkcs7.encode(text)
+        self.pkcs7.pad_into(buf, text_length)
         # 加密
-        cryptor = AES.new(self.key, self.mode, self.key[:16])
+        cryptor = self.new_cipher()
         try:
-            ciphertext = cryptor.encrypt(text)
+            cryptor.encrypt(buf, output=buf)
             # 使用BASE64对加密后的字符串进行编码
-            return ierror.WXBizMsgCrypt_OK, base64.b64encode(ciphertext)
+            return ierror.WXBizMsgCrypt_OK, base64.b64encode(buf)
         except Exception as e:
             logger = logging.getLogger()
             logger.error(e)
@@ -170,31 +209,92 @@ class Prpcrypt(object):
         @return: 删除填充补位后的明文
         """
         try:
-            cryptor = AES.new(self.key, self.mode, self.key[:16])
+            cryptor = self.new_cipher()
             # 使用BASE64对密文进行解码，然后AES-CBC解密
-            plain_text = cryptor.decrypt(base64.b64decode(text))
+            ciphertext = base64.b64decode(text)
+            plain_text = bytearray(len(ciphertext))
+            cryptor.decrypt(ciphertext, output=plain_text)
         except Exception as e:
             logger = logging.getLogger()
             logger.error(e)
             return ierror.WXBizMsgCrypt_DecryptAES_Error, None
+        return self.unpack(plain_text, receiveid)
+
+    def decrypt_batch(self, texts, receiveid):
+        """批量解密，所有密文拼接后只做一次 AES-CBC 解密
+        @param texts: 密文列表
+        @return: [(ret, xml_content), ...]，与 texts 一一对应
+        """
+        results = [None] * len(texts)
+        blobs = []
+        indexes = []
+        for i, text in enumerate(texts):
+            try:
+                blob = base64.b64decode(text)
+                if not blob or len(blob) % self.aes.block_size:
+                    raise ValueError("ciphertext length is not a multiple of block size")
+            except Exception as e:
+                logger = logging.getLogger()
+                logger.error(e)
+                results[i] = (ierror.WXBizMsgCrypt_DecryptAES_Error, None)
+                continue
+            blobs.append(blob)
+            indexes.append(i)
+        if not blobs:
+            return results
+
         try:
-            pad = plain_text[-1]
-            # 去掉补位字符串
-            # pkcs7 = PKCS7Encoder()
-            # plain_text = pkcs7.encode(plain_text)
-            # 去除16位随机字符串
-            content = plain_text[16:-pad]
-            xml_len = socket.ntohl(struct.unpack("I", content[: 4])[0])
-            xml_content = content[4: xml_len + 4]
-            from_receiveid = content[xml_len + 4:]
+            ciphertext = b"".join(blobs)
+            plain = bytearray(len(ciphertext))
+            self.new_cipher().decrypt(ciphertext, output=plain)
+        except Exception as e:
+            logger = logging.getLogger()
+            logger.error(e)
+            for i in indexes:
+                results[i] = (ierror.WXBizMsgCrypt_DecryptAES_Error, None)
+            return results
+
+        # 每条消息都以 iv 开始 CBC 链；拼接解密后，后续消息的首块被前一条密文的
+        # 末块异或，这里异或 (前一条末块 ^ iv) 修正回来
+        iv = int.from_bytes(self.iv, "big")
+        offset = 0
+        prev_last = None
+        for blob in blobs:
+            if prev_last is not None:
+                head = int.from_bytes(plain[offset:offset + 16], "big")
+                plain[offset:offset + 16] = (head ^ prev_last ^ iv).to_bytes(16, "big")
+            prev_last = int.from_bytes(blob[-16:], "big")
+            offset += len(blob)
+
+        view = memoryview(plain)
+        offset = 0
+        for i, blob in zip(indexes, blobs):
+            results[i] = self.unpack(view[offset:offset + len(blob)], receiveid)
+            offset += len(blob)
+        return results
+
+    def unpack(self, plain_text, receiveid):
+        """去除补位和16位随机字符串，校验 receiveid 后返回明文
+        plain_text 以 memoryview 访问，只在返回消息体时复制一次
+        """
+        try:
+            view = memoryview(plain_text)
+            pad = view[-1]
+            # 去掉补位字符串，去除16位随机字符串
+            end = len(view) - pad
+            xml_len = self.LENGTH.unpack_from(view, self.RANDOM_LEN)[0]
+            xml_end = self.HEADER_LEN + xml_len
+            if xml_end > end:
+                raise ValueError("xml length out of range")
+            from_receiveid = view[xml_end:end]
         except Exception as e:
             logger = logging.getLogger()
             logger.error(e)
             return ierror.WXBizMsgCrypt_IllegalBuffer, None
 
-        if from_receiveid.decode('utf8') != receiveid:
+        if from_receiveid != receiveid.encode('utf8'):
             return ierror.WXBizMsgCrypt_ValidateCorpid_Error, None
-        return 0, xml_content
+        return 0, view[self.HEADER_LEN:xml_end].tobytes()
 
     def get_random_str(self):
         """ 随机生成16位字符串
@@ -214,6 +314,10 @@ class WXBizMsgCrypt(object):
             # return ierror.WXBizMsgCrypt_IllegalAesKey,None
         self.m_sToken = sToken
         self.m_sReceiveId = sReceiveId
+        # 加解密上下文：每个实例只构造一次，辅助对象均无状态，可在多线程间共享
+        self.pc = Prpcrypt(self.key)
+        self.sha1 = SHA1()
+        self.xmlParse = XMLParse()
 
         # 验证URL
         # @param sMsgSignature: 签名串，对应URL参数的msg_signature
@@ -224,14 +328,12 @@ class WXBizMsgCrypt(object):
         # @return：成功0，失败返回对应的错误码
 
     def VerifyURL(self, sMsgSignature, sTimeStamp, sNonce, sEchoStr):
-        sha1 = SHA1()
-        ret, signature = sha1.getSHA1(self.m_sToken, sTimeStamp, sNonce, sEchoStr)
+        ret, signature = self.sha1.getSHA1(self.m_sToken, sTimeStamp, sNonce, sEchoStr)
         if ret != 0:
             return ret, None
         if not signature == sMsgSignature:
             return ierror.WXBizMsgCrypt_ValidateSignature_Error, None
-        pc = Prpcrypt(self.key)
-        ret, sReplyEchoStr = pc.decrypt(sEchoStr, self.m_sReceiveId)
+        ret, sReplyEchoStr = self.pc.decrypt(sEchoStr, self.m_sReceiveId)
         return ret, sReplyEchoStr
 
     def EncryptMsg(self, sReplyMsg, sNonce, timestamp=None):
@@ -241,20 +343,17 @@ class WXBizMsgCrypt(object):
         # @param sNonce: 随机串，可以自己生成，也可以用URL参数的nonce
         # sEncryptMsg: 加密后的可以直接回复用户的密文，包括msg_signature, timestamp, nonce, encrypt的xml格式的字符串,
         # return：成功0，sEncryptMsg,失败返回对应的错误码None
-        pc = Prpcrypt(self.key)
-        ret, encrypt = pc.encrypt(sReplyMsg, self.m_sReceiveId)
-        encrypt = encrypt.decode('utf8')
+        ret, encrypt = self.pc.encrypt(sReplyMsg, self.m_sReceiveId)
         if ret != 0:
             return ret, None
+        encrypt = encrypt.decode('utf8')
         if timestamp is None:
             timestamp = str(int(time.time()))
         # 生成安全签名
-        sha1 = SHA1()
-        ret, signature = sha1.getSHA1(self.m_sToken, timestamp, sNonce, encrypt)
+        ret, signature = self.sha1.getSHA1(self.m_sToken, timestamp, sNonce, encrypt)
         if ret != 0:
             return ret, None
-        xmlParse = XMLParse()
-        return ret, xmlParse.generate(encrypt, signature, timestamp, sNonce)
+        return ret, self.xmlParse.generate(encrypt, signature, timestamp, sNonce)
 
     def DecryptMsg(self, sPostData, sMsgSignature, sTimeStamp, sNonce):
         # 检验消息的真实性，并且获取解密后的明文
@@ -265,16 +364,46 @@ class WXBizMsgCrypt(object):
         #  xml_content: 解密后的原文，当return返回0时有效
         # @return: 成功0，失败返回对应的错误码
         # 验证安全签名
-        xmlParse = XMLParse()
-        ret, encrypt = xmlParse.extract(sPostData)
+        ret, encrypt = self.xmlParse.extract(sPostData)
         if ret != 0:
             return ret, None
-        sha1 = SHA1()
-        ret, signature = sha1.getSHA1(self.m_sToken, sTimeStamp, sNonce, encrypt)
+        ret, signature = self.sha1.getSHA1(self.m_sToken, sTimeStamp, sNonce, encrypt)
         if ret != 0:
             return ret, None
         if not signature == sMsgSignature:
             return ierror.WXBizMsgCrypt_ValidateSignature_Error, None
-        pc = Prpcrypt(self.key)
-        ret, xml_content = pc.decrypt(encrypt, self.m_sReceiveId)
+        ret, xml_content = self.pc.decrypt(encrypt, self.m_sReceiveId)
         return ret, xml_content
+
+    def EncryptMsgBatch(self, replies, sNonce, timestamp=None):
+        # 批量加密回复消息，共用同一个时间戳和随机串
+        # @param replies: 待回复的xml消息列表
+        # @return: [(ret, sEncryptMsg), ...]，与 replies 一一对应
+        if timestamp is None:
+            timestamp = str(int(time.time()))
+        return [self.EncryptMsg(reply, sNonce, timestamp) for reply in replies]
+
+    def DecryptMsgBatch(self, messages):
+        # 批量校验签名并解密，用于回放积压回调或压测
+        # @param messages: [(sPostData, sMsgSignature, sTimeStamp, sNonce), ...]
+        # @return: [(ret, xml_content), ...]，与 messages 一一对应
+        results = [None] * len(messages)
+        encrypts = []
+        indexes = []
+        for i, (sPostData, sMsgSignature, sTimeStamp, sNonce) in enumerate(messages):
+            ret, encrypt = self.xmlParse.extract(sPostData)
+            if ret != 0:
+                results[i] = (ret, None)
+                continue
+            ret, signature = self.sha1.getSHA1(self.m_sToken, sTimeStamp, sNonce, encrypt)
+            if ret != 0:
+                results[i] = (ret, None)
+                continue
+            if not signature == sMsgSignature:
+                results[i] = (ierror.WXBizMsgCrypt_ValidateSignature_Error, None)
+                continue
+            encrypts.append(encrypt)
+            indexes.append(i)
+        for i, result in zip(indexes, self.pc.decrypt_batch(encrypts, self.m_sReceiveId)):
+            results[i] = result
+        return results
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""基准测试用网页：结构仿照 BBC 首页和文章页（内联 JSON 脚本、导航、卡片列表、页脚）
+
+保存的真实页面放在同一目录下的 home.html / article.html 即可替代合成页面。
+用法: python3 benchmarks/bbc_pages.py fixtures_dir
+"""
+import argparse
+import html
+import json
+import os
+import random
+
+WORDS = "government minister said people country election police city report health year " \
+        "climate court president market water school energy official family week war".split()
+
+
+def words(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize()
+
+
+def _head(rng, title, state_kb):
+    # BBC 页面在 <head>/<body> 里内联了很大的 JSON 状态脚本
+    state = {"props": [{"id": i, "headline": words(rng, 10), "summary": words(rng, 30)}
+                       for i in range(state_kb * 1024 // 300)]}
+    return (f"<!DOCTYPE html><html lang=\"en-GB\"><head><meta charset=\"utf-8\"><title>{title}</title>"
+            + "".join(f'<link rel="preload" href="/static/{i}.js" as="script">' for i in range(30))
+            + "<style>" + "body{margin:0}.card{display:flex}" * 200 + "</style></head><body>"
+            + f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(state)}</script>')
+
+
+def _nav(rng):
+    links = "".join(f'<li><a href="/news/{w}">{w.title()}</a></li>' for w in WORDS)
+    return f'<header><nav><ul>{links}</ul></nav><div id="search"><input type="text"></div></header>'
+
+
+def _footer(rng):
+    links = "".join(f'<li><a href="/{w}">{w}</a></li>' for w in WORDS * 3)
+    return (f"<footer><ul>{links}</ul><p>Copyright 2025 BBC. All rights reserved.</p>"
+            "<p>The BBC is not responsible for the content of external sites. "
+            "<a href=\"/editorialguidelines\">Read about our approach to external linking.</a></p>"
+            "</footer></body></html>")
+
+
+def homepage(seed=0, cards=150, state_kb=150):
+    rng = random.Random(seed)
+    parts = [_head(rng, "Home - BBC News", state_kb), _nav(rng), '<main id="main-content"><div class="layout">']
+    for i in range(cards):
+        parts.append(
+            f'<div class="card" data-testid="card-{i}"><a href="/news/articles/c{seed}{i:04d}o">'
+            f'<div class="image"><img src="https://ichef.bbci.co.uk/{i}.jpg" alt="{words(rng, 5)}"></div>'
+            f"<h2>{html.escape(words(rng, 9))}</h2></a><p>{words(rng, 25)}</p>"
+            f'<span class="meta">{rng.randint(1, 59)} mins ago</span></div>')
+    parts.append("</div></main>")
+    parts.append(_footer(rng))
+    return "".join(parts)
+
+
+def article(seed=0, paragraphs=40, state_kb=100):
+    rng = random.Random(seed)
+    parts = [_head(rng, "Article - BBC News", state_kb), _nav(rng), '<main id="main-content"><article>',
+             f"<header><h1>{html.escape(words(rng, 12))}</h1></header>",
+             f'<div class="byline"><p>By {words(rng, 2)}</p><time>2 hours ago</time></div>']
+    for i in range(paragraphs):
+        if i % 8 == 3:
+            parts.append(f'<figure><img src="https://ichef.bbci.co.uk/a{i}.jpg"><figcaption>{words(rng, 8)}'
+                         "</figcaption></figure>")
+        parts.append(f"<p>{words(rng, 15)} <a href=\"/news/{i}\">{words(rng, 3)}</a> "
+                     f"<b>{words(rng, 4)}</b> {words(rng, 25)}.</p>")
+    parts.append(f"<p>With additional reporting by {words(rng, 2)}</p></article>")
+    parts.append('<section class="related"><h2>Related</h2>'
+                 + "".join(f'<p><a href="/news/r{i}">{words(rng, 8)}</a></p>' for i in range(20))
+                 + "</section></main>")
+    parts.append(_footer(rng))
+    return "".join(parts)
+
+
+def load_pages(directory=None):
+    """{名称: html}；目录中有 home.html / article.html 时使用保存的真实页面"""
+    pages = {"home": homepage, "article": article}
+    result = {}
+    for name, generate in pages.items():
+        path = os.path.join(directory, f"{name}.html") if directory else None
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                result[name] = f.read()
+        else:
+            result[name] = generate()
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="生成合成的 BBC 页面")
+    parser.add_argument("out_dir")
+    args = parser.parse_args()
+    os.makedirs(args.out_dir, exist_ok=True)
+    for name, page in load_pages().items():
+        with open(os.path.join(args.out_dir, f"{name}.html"), "w", encoding="utf-8") as f:
+            f.write(page)
+        print(f"已生成 {name}.html  {len(page) / 1024:.0f} KB")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Prpcrypt 缓冲区处理的分配量基准：旧的切片/拼接实现 vs memoryview/预分配实现
+
+用 tracemalloc 统计单条大消息（默认 64KB，接近一篇 BBC 正文）加解密过程中
+的峰值内存增量和耗时；解包阶段单独统计，不含 base64/AES。
+用法: python3 benchmarks/bench_buffers.py --size 65536
+"""
+import argparse
+import base64
+import os
+import socket
+import struct
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Crypto.Cipher import AES  # noqa: E402
+from WXBizMsgCrypt import Prpcrypt  # noqa: E402
+
+RECEIVE_ID = "bench_corp"
+
+
+# ---------- 旧实现（仅用于对比） ----------
+def legacy_encrypt(key, text, receiveid, random_str):
+    text = text.encode()
+    text = random_str + struct.pack("I", socket.htonl(len(text))) + text + receiveid.encode()
+    amount_to_pad = 32 - (len(text) % 32)
+    text = text + (chr(amount_to_pad) * amount_to_pad).encode()
+    cryptor = AES.new(key, AES.MODE_CBC, key[:16])
+    return base64.b64encode(cryptor.encrypt(text))
+
+
+def legacy_decrypt(key, text, receiveid):
+    cryptor = AES.new(key, AES.MODE_CBC, key[:16])
+    plain_text = cryptor.decrypt(base64.b64decode(text))
+    return legacy_unpack(plain_text, receiveid)
+
+
+def legacy_unpack(plain_text, receiveid):
+    pad = plain_text[-1]
+    content = plain_text[16:-pad]
+    xml_len = socket.ntohl(struct.unpack("I", content[: 4])[0])
+    xml_content = content[4: xml_len + 4]
+    from_receiveid = content[xml_len + 4:]
+    assert from_receiveid.decode("utf8") == receiveid
+    return xml_content
+
+
+def measure(label, func, repeat):
+    tracemalloc.start()
+    func()  # 预热
+    base, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<18} 峰值新增 {(peak - base) / 1024:9.1f} KB  耗时 {elapsed * 1e6:9.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=65536, help="消息正文字节数")
+    parser.add_argument("--repeat", type=int, default=200, help="计时重复次数")
+    args = parser.parse_args()
+
+    key = os.urandom(32)
+    pc = Prpcrypt(key)
+    text = "<xml><Content><![CDATA[" + "x" * args.size + "]]></Content></xml>"
+    random_str = pc.get_random_str()
+
+    ret, encrypted = pc.encrypt(text, RECEIVE_ID)
+    assert ret == 0
+    # 新旧实现输出互通
+    assert legacy_decrypt(key, encrypted, RECEIVE_ID) == text.encode()
+    assert pc.decrypt(legacy_encrypt(key, text, RECEIVE_ID, random_str), RECEIVE_ID) == (0, text.encode())
+
+    print(f"消息正文: {len(text)} 字节")
+    measure("legacy encrypt", lambda: legacy_encrypt(key, text, RECEIVE_ID, random_str), args.repeat)
+    measure("Prpcrypt.encrypt", lambda: pc.encrypt(text, RECEIVE_ID), args.repeat)
+    measure("legacy decrypt", lambda: legacy_decrypt(key, encrypted, RECEIVE_ID), args.repeat)
+    measure("Prpcrypt.decrypt", lambda: pc.decrypt(encrypted, RECEIVE_ID), args.repeat)
+
+    # 单独统计解包阶段（去补位、取长度、切出消息体），不含 base64 与 AES
+    plain = bytearray(len(base64.b64decode(encrypted)))
+    pc.new_cipher().decrypt(base64.b64decode(encrypted), output=plain)
+    plain_bytes = bytes(plain)
+    measure("legacy unpack", lambda: legacy_unpack(plain_bytes, RECEIVE_ID), args.repeat)
+    measure("Prpcrypt.unpack", lambda: pc.unpack(plain, RECEIVE_ID), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""企业微信回调应答延迟基准：回调里同步处理 vs 入队后立即应答
+
+子进程里启动 learning.py 的 Flask 应用（多线程 werkzeug 服务器，与线上 app.run 一致），
+推送任务换成假任务：先占用 --job-cpu-ms 的 CPU（渲染、拼接消息），再等待到共 --job-ms（抓取、推送
+的网络等待）；父进程用多个线程并发发送加密的 "sat" 命令消息，统计从发出
+请求到收到 "success" 的 p50/p99/最大延迟。"inline" 是改动前的回调（解析、日志、提交任务都在
+请求线程里），"queue" 是当前的 /wechat_callback。--duplicate 按比例重发相同 MsgId 的消息，模拟
+企业微信超时重试，报告实际执行的任务数。
+用法: python3 benchmarks/bench_callback.py [-n 2000] [-c 16] [--job-ms 3000] [--job-cpu-ms 5] [--duplicate 0.1]
+"""
+import argparse
+import base64
+import http.client
+import json
+import logging
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TOKEN = "benchtoken"
+CORP_ID = "wwbench"
+MODES = {"inline": "/legacy_callback", "queue": "/wechat_callback"}
+
+
+# ---------- 服务端（子进程） ----------
+def fake_job_body(job_ms, cpu_ms):
+    start = time.perf_counter()
+    while time.perf_counter() < start + cpu_ms / 1000:
+        pass
+    time.sleep(max(0, start + job_ms / 1000 - time.perf_counter()))
+
+
+def serve(job_ms, cpu_ms, log_path):
+    import quotes
+    import question_store
+    # 不启动每日一句预取和题库监视，避免访问网络和 /home/learning
+    quotes.start_prefetcher = lambda *args, **kwargs: None
+    question_store.StoreLoader.watch = lambda self, interval: None
+
+    import learning
+    from flask import request
+    from werkzeug.serving import make_server
+
+    # 线上日志写入 learning.py.log，这里写到临时文件
+    handler = logging.FileHandler(log_path)
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    root.addHandler(handler)
+
+    executed = []
+
+    def fake_job(*args):
+        fake_job_body(job_ms, cpu_ms)
+        executed.append(args)
+
+    for name in ("start", "sat", "bbc"):
+        learning.runner.register(name, fake_job)
+
+    def legacy_callback():
+        # 改动前的 POST 分支：解密、解析、日志、提交任务全部在请求线程里完成
+        msg_signature = request.args.get('msg_signature', '')
+        timestamp = request.args.get('timestamp', '')
+        nonce = request.args.get('nonce', '')
+        xml_data = request.data
+        logging.debug(f"POST params - msg_signature: {msg_signature}, timestamp: {timestamp}, nonce: {nonce}")
+        logging.debug(f"POST data: {xml_data}")
+        ret, decrypted_xml = learning.crypto.DecryptMsg(xml_data, msg_signature, timestamp, nonce)
+        logging.debug(f"DecryptMsg ret: {ret}, decrypted_xml: {decrypted_xml}")
+        if ret != 0:
+            return "解密失败", 400
+        xml_tree = learning.ET.fromstring(decrypted_xml)
+        msg_type = xml_tree.find('MsgType').text if xml_tree.find('MsgType') is not None else 'unknown'
+        if msg_type == 'text':
+            content = xml_tree.find('Content').text.strip()
+            logging.info(f"收到文本消息: {content}")
+            command, _, args = content.partition(" ")
+            if command.lower() in ("start", "sat", "bbc"):
+                learning.submit_job(command.lower(), *([args.strip()] if args.strip() else []))
+        return "success"
+
+    def stats():
+        # 等消息队列和任务队列都处理完，返回执行过的任务数并清零
+        learning.inbox._queue.join()
+        learning.runner._queue.join()
+        count = len(executed)
+        executed.clear()
+        learning._recent_messages.clear()
+        return json.dumps({"executed": count})
+
+    learning.app.add_url_rule("/legacy_callback", "legacy_callback", legacy_callback, methods=["POST"])
+    learning.app.add_url_rule("/bench_stats", "bench_stats", stats)
+    server = make_server("127.0.0.1", 0, learning.app, threaded=True)
+    print(server.server_port, flush=True)
+    server.serve_forever()
+
+
+# ---------- 负载生成（父进程） ----------
+def make_requests(crypto, count, duplicate, seed=0):
+    """预先加密好所有消息：[(查询串, 请求体)]，duplicate 比例的消息会再发一次"""
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        timestamp = str(int(time.time()))
+        nonce = str(rng.randrange(10 ** 9))
+        plain = (f"<xml><ToUserName><![CDATA[{CORP_ID}]]></ToUserName><FromUserName><![CDATA[user{i % 7}]]>"
+                 f"</FromUserName><CreateTime>{timestamp}</CreateTime><MsgType><![CDATA[text]]></MsgType>"
+                 f"<Content><![CDATA[sat]]></Content><MsgId>{10 ** 12 + i}</MsgId><AgentID>1</AgentID></xml>")
+        ret, body = crypto.EncryptMsg(plain, nonce, timestamp)
+        signature = re.search(r"<MsgSignature><!\[CDATA\[(.*?)\]\]>", body).group(1)
+        query = f"?msg_signature={signature}&timestamp={timestamp}&nonce={nonce}"
+        items.append((query, body.encode()))
+        if rng.random() < duplicate:
+            items.append((query, body.encode()))
+    return items
+
+
+def load(port, path, items, concurrency):
+    """并发发送，返回 (每个请求的应答延迟 ms, 总耗时 s)"""
+    latencies = []
+    lock = threading.Lock()
+    it = iter(items)
+
+    def client():
+        own = []
+        while True:
+            with lock:
+                item = next(it, None)
+            if item is None:
+                break
+            query, body = item
+            start = time.perf_counter()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            conn.request("POST", path + query, body=body, headers={"Content-Type": "text/xml"})
+            res = conn.getresponse()
+            reply = res.read()
+            conn.close()
+            own.append((time.perf_counter() - start) * 1000)
+            if reply != b"success":
+                raise RuntimeError(f"{res.status} {reply[:100]!r}")
+        with lock:
+            latencies.extend(own)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, time.perf_counter() - start
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--count", type=int, default=2000, help="消息条数")
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("--job-ms", type=float, default=3000, help="每个假任务的总耗时（毫秒）")
+    parser.add_argument("--job-cpu-ms", type=float, default=5, help="其中占用 CPU 的毫秒数")
+    parser.add_argument("--duplicate", type=float, default=0.1, help="重发相同 MsgId 的比例")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        return serve(args.job_ms, args.job_cpu_ms, os.environ["BENCH_LOG"])
+
+    aes_key = base64.b64encode(os.urandom(32)).decode()[:-1]
+    env = dict(os.environ, WX_TOKEN=TOKEN, WX_ENCODING_AES_KEY=aes_key, WX_CORP_ID=CORP_ID)
+    from WXBizMsgCrypt import WXBizMsgCrypt
+    crypto = WXBizMsgCrypt(TOKEN, aes_key, CORP_ID)
+
+    with tempfile.TemporaryDirectory() as d:
+        env["BENCH_LOG"] = os.path.join(d, "learning.log")
+        server = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve", "--job-ms", str(args.job_ms),
+                                   "--job-cpu-ms", str(args.job_cpu_ms)],
+                                  cwd=d, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        try:
+            port = int(server.stdout.readline())
+            print(f"消息 {args.count} 条（重发比例 {args.duplicate}），并发 {args.concurrency}，"
+                  f"每个任务 {args.job_ms:g} ms（其中 CPU {args.job_cpu_ms:g} ms）")
+            for mode, path in MODES.items():
+                items = make_requests(crypto, args.count, args.duplicate)
+                load(port, path, items[:50], args.concurrency)  # 预热
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=600)
+                conn.request("GET", "/bench_stats")
+                conn.getresponse().read()
+                latencies, elapsed = load(port, path, items, args.concurrency)
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=600)
+                conn.request("GET", "/bench_stats")
+                executed = json.loads(conn.getresponse().read())["executed"]
+                print(f"{mode:<7} p50 {statistics.median(latencies):7.2f} ms  p99 {percentile(latencies, 99):7.2f} ms  "
+                      f"最大 {max(latencies):7.2f} ms  {len(latencies) / elapsed:7.0f} 请求/s  "
+                      f"请求 {len(items)}  执行任务 {executed}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
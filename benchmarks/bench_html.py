@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""bbc.py 页面提取基准：BeautifulSoup(html.parser) 全量建树 vs html_extract 定向提取
+
+对首页（找头条链接）和文章页（标题 + 段落）分别统计每页解析耗时和解析一次的
+tracemalloc 峰值。tracemalloc 只统计 Python 对象，lxml 树由 libxml2 分配不在其中，
+但提前停止时只会为已解析的部分建树，函数返回即释放。
+用法: python3 benchmarks/bench_html.py [-n 20] [--fixtures 保存页面的目录]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+import html_extract  # noqa: E402
+from benchmarks.bbc_pages import load_pages  # noqa: E402
+
+
+# ---------- 旧实现（仅用于对比） ----------
+def legacy_headline(page):
+    soup = BeautifulSoup(page, "html.parser")
+    link = soup.find("main", id="main-content").find("a")
+    return link["href"], link.get_text(strip=True)
+
+
+def legacy_article(page):
+    soup = BeautifulSoup(page, "html.parser")
+    title_tag = soup.find("h1")
+    article = soup.find("article")
+    paragraphs = (article or soup).find_all("p")
+    return title_tag.get_text(strip=True), [p.get_text(strip=True) for p in paragraphs]
+
+
+def new_headline(page):
+    return html_extract.first_link(page)[1:]
+
+
+def new_article(page):
+    return html_extract.article_text(page)
+
+
+def without_lxml(func):
+    # 模拟没有安装 lxml 的环境：走 SoupStrainer 分支
+    def run(page):
+        lxml, html_extract._lxml = html_extract._lxml, lambda: None
+        try:
+            return func(page)
+        finally:
+            html_extract._lxml = lxml
+    return run
+
+
+ENGINES = {
+    "home": [("legacy html.parser", legacy_headline), ("lxml 流式+提前停止", new_headline),
+             ("SoupStrainer 回退", without_lxml(new_headline))],
+    "article": [("legacy html.parser", legacy_article), ("lxml 流式", new_article),
+                ("SoupStrainer 回退", without_lxml(new_article))],
+}
+
+
+def traced_peak(func, page):
+    tracemalloc.start()
+    func(page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--number", type=int, default=20)
+    parser.add_argument("--fixtures", help="含 home.html / article.html 的目录，不传则用合成页面")
+    args = parser.parse_args()
+
+    pages = load_pages(args.fixtures)
+    for name, engines in ENGINES.items():
+        page = pages[name]
+        print(f"[{name}] {len(page) / 1024:.0f} KB")
+        expected = engines[0][1](page)
+        baseline = None
+        for engine, func in engines:
+            same = func(page) == expected
+            start = time.perf_counter()
+            for _ in range(args.number):
+                func(page)
+            per_page = (time.perf_counter() - start) / args.number * 1000
+            baseline = baseline or per_page
+            print(f"  {engine:<20} {per_page:8.2f} ms/页  {baseline / per_page:6.1f}x  "
+                  f"Python 峰值 {traced_peak(func, page) / 1024:7.1f} KB  {'结果一致' if same else '结果不一致'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""latex_to_text 基准：旧的正则/replace 链 vs 单遍翻译器
+
+对题库中所有题干、选项和解析做一次文本化，分别统计无缓存和缓存命中时的耗时，每项取 -r 轮中最快的一轮。
+计时前先核对 CASES 中的翻译结果，不一致时退出码非 0。
+用法: python3 benchmarks/bench_latex.py [questions.json] [-n 20000] [-r 5]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from latex_text import LatexTranslator  # noqa: E402
+from question_bank import QUESTION_FILE, load_bank, iter_strings  # noqa: E402
+
+
+def legacy_latex_to_text(s):
+    """旧实现（仅用于对比）"""
+    if not isinstance(s, str):
+        return s
+    s = re.sub(r"\\frac\{([^}]*)\}\{([^}]*)\}", r"\1/\2", s)
+    s = s.replace(r"\left(", "(").replace(r"\right)", ")")
+    s = re.sub(r"\$\$(.*?)\$\$", r"\1", s)
+    s = re.sub(r"\$(.*?)\$", r"\1", s)
+    s = re.sub(r"\\sqrt\{([^}]*)\}", r"sqrt(\1)", s)
+    s = s.replace(r"\cdot", "*").replace(r"\times", "*")
+    s = s.replace(r"\le", "<=").replace(r"\ge", ">=")
+    s = s.replace(r"\neq", "!=").replace(r"\approx", "approx")
+    s = s.replace(r"\pi", "pi")
+    s = s.replace(r"\,", " ").replace(r"\;", " ")
+    s = s.replace("\\", "")
+    return s
+
+
+# (输入, 期望输出)：落单的 $ 是金额等普通字符，原样保留
+CASES = [
+    ("The ticket costs $5 today.", "The ticket costs $5 today."),
+    ("A $ sign", "A $ sign"),
+    ("$x^2$ costs $5", "x^2 costs $5"),
+    ("$$a$$ and $5", "a and $5"),
+    (r"$\frac{1}{2} \leq x$", "1/2 <= x"),
+    (r"$\frac{a+1}{b}$", "(a+1)/b"),
+    (r"$\sqrt[3]{x}$", "root(3, x)"),
+    (r"price \$ 3", "price $ 3"),
+]
+
+
+def check(translator):
+    failed = 0
+    for source, expected in CASES:
+        result = translator.translate(source)
+        if result != expected:
+            failed += 1
+            print(f"不一致: {source!r} -> {result!r}，期望 {expected!r}")
+    return failed
+
+
+def run(strings, func):
+    start = time.perf_counter()
+    for s in strings:
+        func(s)
+    return time.perf_counter() - start
+
+
+def report(label, strings, elapsed):
+    print(f"{label:<22} {elapsed * 1000:9.1f} ms  {len(strings) / elapsed:11.0f} 条/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", nargs="?", default=QUESTION_FILE, help="题库 JSON，不存在时使用合成题库")
+    parser.add_argument("-n", "--count", type=int, default=20000, help="合成题库题数")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="每项计时的轮数")
+    args = parser.parse_args()
+
+    failed = check(LatexTranslator())
+    if failed:
+        sys.exit(f"{failed} 个用例不一致")
+
+    strings = list(iter_strings(load_bank(args.path, args.count)))
+    print(f"字符串数: {len(strings)}  总长度: {sum(map(len, strings))}")
+
+    # 旧实现和无缓存交替计时（无缓存每轮用新的翻译器），各取最快的一轮，机器负载波动对两者的影响相同
+    legacy = cold = float("inf")
+    for _ in range(args.repeat):
+        legacy = min(legacy, run(strings, legacy_latex_to_text))
+        cold = min(cold, run(strings, LatexTranslator(cache_size=len(strings)).translate))
+    translator = LatexTranslator(cache_size=len(strings))
+    run(strings, translator.translate)
+    warm = min(run(strings, translator.translate) for _ in range(args.repeat))
+    report("legacy latex_to_text", strings, legacy)
+    report("LatexTranslator 无缓存", strings, cold)
+    report("LatexTranslator 缓存", strings, warm)
+    print(f"相对旧实现：无缓存 {legacy / cold:.2f}x，缓存命中 {legacy / warm:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""推送脚本冷启动基准：每次在新进程里 python3 -X importtime 导入脚本模块
+
+推送命令每次都启动新的 python3 进程，模块顶层导入的依赖每次都要付一遍。报告每个脚本
+导入耗时（importtime 的累计时间）和进程总耗时的中位数，以及导入时已经加载的重依赖；
+--baseline 用 git archive 取出指定版本做对比，--profile 列出某个脚本自身耗时最多的模块。
+用法: python3 benchmarks/bench_startup.py [-n 10] [--baseline HEAD~1] [--profile main] [脚本模块 ...]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TARGETS = ["main", "sat", "bbc", "date", "WXBizMsgCrypt"]
+# 导入耗时在几毫秒以上的第三方依赖
+HEAVY = ["requests", "urllib3", "jwt", "cryptography", "bs4", "lxml", "Crypto", "cnlunar", "dotenv", "flask"]
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+def import_profile(tree, target):
+    """在 tree 目录下新进程导入 target，返回 (进程耗时 s, [(自身 us, 累计 us, 层级, 模块名)])
+    只保留 import target 这一棵子树，不含解释器启动时 site 等的导入
+    """
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {target}"], cwd=tree,
+                          capture_output=True, text=True, env=dict(os.environ, PYTHONPATH=tree))
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{tree}: import {target} 失败\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = LINE.match(line)
+        if not m:
+            continue
+        row = (int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2, m.group(4))
+        # 子模块先于父模块输出，遇到顶层的非目标模块时丢弃已收集的行
+        rows.append(row)
+        if row[2] == 0:
+            if row[3] == target:
+                return elapsed, rows
+            rows = []
+    return elapsed, []
+
+
+def measure(tree, target, number):
+    """{"import": 中位数 ms, "wall": 中位数 ms, "heavy": [已加载的重依赖]}"""
+    import_profile(tree, target)  # 预热：生成 __pycache__
+    imports, walls, heavy = [], [], set()
+    for _ in range(number):
+        elapsed, rows = import_profile(tree, target)
+        walls.append(elapsed * 1000)
+        imports.append(rows[-1][1] / 1000 if rows else 0)
+        heavy.update(name.split(".")[0] for _, _, _, name in rows)
+    return {"import": statistics.median(imports), "wall": statistics.median(walls),
+            "heavy": [name for name in HEAVY if name in heavy]}
+
+
+def export_tree(rev, directory):
+    """把 git 版本 rev 的文件导出到 directory"""
+    archive = subprocess.run(["git", "archive", "--format=tar", rev], cwd=ROOT, check=True, capture_output=True).stdout
+    subprocess.run(["tar", "-x", "-C", directory], input=archive, check=True)
+
+
+def print_profile(tree, target, top):
+    import_profile(tree, target)
+    _, rows = import_profile(tree, target)
+    total = rows[-1][1] if rows else 0
+    packages = {}
+    for own, _, _, name in rows:
+        packages[name.split(".")[0]] = packages.get(name.split(".")[0], 0) + own
+    print(f"\nimport {target}: {total / 1000:.1f} ms，按顶层包汇总的自身耗时（前 {top}）:")
+    for name, own in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {name:<28} {own / 1000:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("targets", nargs="*", default=TARGETS)
+    parser.add_argument("-n", "--number", type=int, default=10)
+    parser.add_argument("--baseline", help="对比的 git 版本，如 HEAD~1")
+    parser.add_argument("--profile", help="列出该脚本导入时自身耗时最多的包")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        if args.baseline:
+            export_tree(args.baseline, base_dir)
+        for target in args.targets:
+            now = measure(ROOT, target, args.number)
+            line = f"{target:<14} 导入 {now['import']:7.1f} ms  进程 {now['wall']:7.1f} ms"
+            if args.baseline:
+                old = measure(base_dir, target, args.number)
+                line = (f"{target:<14} 导入 {old['import']:7.1f} -> {now['import']:7.1f} ms  "
+                        f"进程 {old['wall']:7.1f} -> {now['wall']:7.1f} ms  ({old['wall'] / now['wall']:.1f}x)")
+                print(line)
+                print(f"{'':<14} {args.baseline} 加载: {', '.join(old['heavy']) or '无'}")
+                print(f"{'':<14} 当前加载: {', '.join(now['heavy']) or '无'}")
+            else:
+                print(line + f"  加载: {', '.join(now['heavy']) or '无'}")
+        if args.profile:
+            if args.baseline:
+                print_profile(base_dir, args.profile, args.top)
+            print_profile(ROOT, args.profile, args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""题库加载的峰值内存基准：json.load 整体读取 vs 流式解析
+
+每种方式在独立的子进程中运行，报告耗时和进程峰值 RSS（ru_maxrss），
+与小内存 VPS 上触发 OOM 的指标一致。默认生成每题带 64KB base64 图片的合成题库。
+用法: python3 benchmarks/bench_stream.py -n 3000 --image-kb 64 [questions.json]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import question_store  # noqa: E402
+
+MODES = ["baseline", "json.load", "stream", "sample", "build"]
+
+
+def legacy_load(path):
+    # 旧的 load_questions：整体解析后再把所有分类拷贝进一个列表
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    all_questions = []
+    for questions in data.values():
+        all_questions.extend(questions)
+    return len(all_questions)
+
+
+def run(mode, path):
+    if mode == "json.load":
+        return legacy_load(path)
+    if mode == "stream":
+        return sum(1 for _ in question_store.iter_questions(path))
+    if mode == "sample":
+        return question_store.random_question(path) is not None
+    if mode == "build":
+        with tempfile.TemporaryDirectory() as d:
+            return question_store.build_store(path, os.path.join(d, "questions.qbin"))
+    return 0
+
+
+def child(mode, path):
+    start = time.perf_counter()
+    run(mode, path)
+    elapsed = time.perf_counter() - start
+    # Linux 上 ru_maxrss 单位为 KB
+    print(json.dumps({"elapsed": elapsed, "maxrss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", nargs="?", help="题库文件，不传则生成合成题库")
+    parser.add_argument("-n", "--count", type=int, default=3000)
+    parser.add_argument("--image-kb", type=int, default=64)
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(*args.child)
+
+    path = args.path
+    tmp = None
+    if not path:
+        # 在子进程里生成，避免本进程的峰值 RSS 被后续子进程继承
+        tmp = tempfile.NamedTemporaryFile(suffix=".json", delete=False)
+        tmp.close()
+        path = tmp.name
+        generator = os.path.join(os.path.dirname(os.path.abspath(__file__)), "question_bank.py")
+        subprocess.run([sys.executable, generator, path, "-n", str(args.count), "--image-kb", str(args.image_kb)],
+                       check=True, capture_output=True)
+    try:
+        print(f"题库: {path}  {os.path.getsize(path) / 1e6:.1f} MB")
+        baseline = None
+        for mode in MODES:
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode, path],
+                                 check=True, capture_output=True, text=True).stdout
+            r = json.loads(out)
+            if baseline is None:
+                baseline = r["maxrss"]
+                print(f"{'解释器基线':<12} {'':>10} {r['maxrss'] / 1024:8.1f} MB")
+                continue
+            print(f"{mode:<12} {r['elapsed'] * 1000:8.1f} ms {r['maxrss'] / 1024:8.1f} MB"
+                  f"  (+{(r['maxrss'] - baseline) / 1024:.1f} MB)")
+    finally:
+        if tmp:
+            os.remove(tmp.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""WXBizMsgCrypt 加解密吞吐量基准：单条接口 vs 批量接口
+
+用本地随机生成的 EncodingAESKey 构造合成回调报文，不依赖企业微信后台。
+用法: python3 benchmarks/bench_wxcrypt.py -n 5000 --size 512
+"""
+import argparse
+import base64
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from WXBizMsgCrypt import WXBizMsgCrypt  # noqa: E402
+
+TOKEN = "bench_token"
+RECEIVE_ID = "bench_corp"
+TIMESTAMP = "1700000000"
+NONCE = "bench_nonce"
+
+ENCRYPT_RE = re.compile(r"<Encrypt><!\[CDATA\[(.*?)\]\]></Encrypt>")
+SIGNATURE_RE = re.compile(r"<MsgSignature><!\[CDATA\[(.*?)\]\]></MsgSignature>")
+
+
+def make_crypto():
+    key = base64.b64encode(os.urandom(32)).decode().rstrip("=")
+    return WXBizMsgCrypt(TOKEN, key, RECEIVE_ID)
+
+
+def make_replies(count, size):
+    body = "x" * size
+    return [f"<xml><MsgType><![CDATA[text]]></MsgType><Content><![CDATA[{i} {body}]]></Content></xml>"
+            for i in range(count)]
+
+
+def make_envelopes(crypto, replies):
+    """把加密结果转换成 DecryptMsg 的入参：(post_data, msg_signature, timestamp, nonce)"""
+    envelopes = []
+    for ret, xml in crypto.EncryptMsgBatch(replies, NONCE, TIMESTAMP):
+        assert ret == 0
+        encrypt = ENCRYPT_RE.search(xml).group(1)
+        signature = SIGNATURE_RE.search(xml).group(1)
+        post_data = f"<xml><ToUserName><![CDATA[{RECEIVE_ID}]]></ToUserName><Encrypt><![CDATA[{encrypt}]]></Encrypt></xml>"
+        envelopes.append((post_data, signature, TIMESTAMP, NONCE))
+    return envelopes
+
+
+def timed(label, count, func):
+    start = time.perf_counter()
+    results = func()
+    elapsed = time.perf_counter() - start
+    assert all(ret == 0 for ret, _ in results), f"{label}: 存在失败的消息"
+    print(f"{label:<16} {count:>7} 条  {elapsed * 1000:9.1f} ms  {count / elapsed:11.0f} msg/s")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--count", type=int, default=5000, help="消息条数")
+    parser.add_argument("--size", type=int, default=512, help="每条消息正文长度")
+    args = parser.parse_args()
+
+    crypto = make_crypto()
+    replies = make_replies(args.count, args.size)
+    envelopes = make_envelopes(crypto, replies)
+
+    print(f"消息数: {args.count}  正文长度: {args.size}")
+    timed("EncryptMsg", args.count,
+          lambda: [crypto.EncryptMsg(r, NONCE, TIMESTAMP) for r in replies])
+    timed("EncryptMsgBatch", args.count,
+          lambda: crypto.EncryptMsgBatch(replies, NONCE, TIMESTAMP))
+    single = timed("DecryptMsg", args.count,
+                   lambda: [crypto.DecryptMsg(*e) for e in envelopes])
+    batch = timed("DecryptMsgBatch", args.count,
+                  lambda: crypto.DecryptMsgBatch(envelopes))
+    assert single == batch, "批量解密结果与单条解密不一致"
+
+
+if __name__ == "__main__":
+    main()
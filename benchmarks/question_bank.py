@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""基准测试用题库：优先读取真实的 questions.json，不存在时生成结构相同的合成题库
+
+用法: python3 benchmarks/question_bank.py out.json -n 50000
+"""
+import argparse
+import base64
+import json
+import os
+import random
+
+QUESTION_FILE = "/home/learning/questions.json"
+
+DOMAINS = {
+    "math": ["Algebra", "Advanced Math", "Problem-Solving and Data Analysis", "Geometry and Trigonometry"],
+    "reading": ["Information and Ideas", "Craft and Structure"],
+    "writing": ["Standard English Conventions", "Expression of Ideas"],
+}
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+FRAGMENTS = [
+    r"$\frac{{{a}}}{{x+{b}}}$", r"$\sqrt{{{a}x^{{2}}+{b}}}$", r"$\left({a}x-{b}\right)^2$",
+    r"$x \leq {a}$", r"$y \geq {b}$", r"$a \neq {a}$", r"${a} \cdot {b}$", r"${a} \times \pi$",
+    r"$\frac{{\frac{{{a}}}{{2}}}}{{{b}}}$", r"$$f(x) = {a}x^{{2}} - {b}x + \sqrt{{{a}}}$$",
+    r"\${a}", "{a}%",
+]
+WORDS = "the value of which expression is equivalent to given that function line slope ratio " \
+        "percent table shows data point circle radius area passage author claims".split()
+
+
+def sentence(rng, words):
+    parts = []
+    for _ in range(words):
+        if rng.random() < 0.15:
+            parts.append(rng.choice(FRAGMENTS).format(a=rng.randint(1, 99), b=rng.randint(1, 99)))
+        else:
+            parts.append(rng.choice(WORDS))
+    return " ".join(parts)
+
+
+def synthetic_bank(count, seed=0, image_kb=0):
+    """合成题库；image_kb > 0 时每题附带一张该大小的 base64 图片"""
+    rng = random.Random(seed)
+    bank = {category: [] for category in DOMAINS}
+    for i in range(count):
+        category = rng.choice(list(DOMAINS))
+        bank[category].append({
+            "id": f"{category}-{i}",
+            "domain": rng.choice(DOMAINS[category]),
+            "difficulty": rng.choice(DIFFICULTIES),
+            "question": {
+                "question": sentence(rng, rng.randint(20, 60)),
+                "choices": {k: sentence(rng, rng.randint(1, 6)) for k in "ABCD"},
+                "correct_answer": rng.choice("ABCD"),
+                "explanation": sentence(rng, rng.randint(40, 160)),
+            },
+        })
+        if image_kb:
+            image = base64.b64encode(rng.randbytes(image_kb * 1024)).decode("ascii")
+            bank[category][-1]["question"]["image"] = f"data:image/png;base64,{image}"
+    return bank
+
+
+def load_bank(path=QUESTION_FILE, count=20000):
+    """读取题库；文件不存在时返回合成题库"""
+    if path and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return synthetic_bank(count)
+
+
+def iter_strings(bank):
+    """题库中所有需要做 LaTeX 文本化的字符串"""
+    for questions in bank.values():
+        for q in questions:
+            body = q["question"]
+            yield body["question"]
+            yield from body["choices"].values()
+            yield body["explanation"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="生成合成题库")
+    parser.add_argument("out")
+    parser.add_argument("-n", "--count", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--image-kb", type=int, default=0, help="每题附带的 base64 图片大小（KB）")
+    args = parser.parse_args()
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(synthetic_bank(args.count, args.seed, args.image_kb), f, ensure_ascii=False)
+    print(f"已生成 {args.out}，共 {args.count} 题")
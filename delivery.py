@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""推送分发：并发发送到所有已配置的渠道
+
+每个渠道独立超时、重试，互不影响；推送总耗时取决于最慢的渠道。
+推送不能重复：只在确定消息没有发出去时重试（连接没建立、对方明确返回暂时性错误），
+其他失败（读超时、连接中途断开、响应无法解析等）消息可能已经送达，不再重试。
+渠道配置（.env）:
+  TELEGRAM_BOT_TOKEN / TELEGRAM_CHAT_ID   多个 chat_id 用逗号分隔
+  WX_CORP_ID / WX_AGENT_ID / WX_SECRET    企业微信应用
+  WX_TOUSER / WX_TOPARTY / WX_TOTAG       企业微信接收人，默认 WX_TOUSER=@all，多个用 | 分隔
+其他渠道用 register_channel 注册。
+消息可以是字符串，也可以是按渠道类型区分的 {"telegram": ..., "wechat": ..., "default": ...}。
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from functools import partial
+
+import http_client
+from wxtoken import TOKEN_EXPIRED_ERRCODES, send_app_message
+
+# 单次发送的超时（秒）、失败重试次数、重试间隔（秒）
+SEND_TIMEOUT = 15
+SEND_RETRIES = 1
+RETRY_BACKOFF = 1.0
+# Telegram 表示限流、服务端暂时故障的 error_code
+TELEGRAM_RETRY_CODES = (429, 500, 502, 503, 504)
+# 企业微信表示系统繁忙的 errcode；token 失效的 errcode 见 wxtoken.TOKEN_EXPIRED_ERRCODES
+WECHAT_BUSY_ERRCODES = (-1,)
+
+
+class DeliveryError(Exception):
+    pass
+
+
+class RetryableError(DeliveryError):
+    """对方明确表示暂时失败、消息没有送达，可以重试"""
+    pass
+
+
+class Channel(object):
+    """一个推送目标：send(msg, timeout) 失败时抛异常，可以重试的暂时性失败抛 RetryableError；
+    kind 为渠道类型，用于选取对应版本的消息
+    """
+
+    def __init__(self, name, send, timeout=SEND_TIMEOUT, retries=SEND_RETRIES, backoff=RETRY_BACKOFF, kind=None):
+        self.name = name
+        self.send = send
+        self.kind = kind
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+
+    def deadline(self):
+        """所有尝试加重试间隔的最长耗时"""
+        return self.timeout * (self.retries + 1) + self.backoff * self.retries * (self.retries + 1) / 2
+
+
+# ===================== 渠道实现 =====================
+def send_telegram(msg, chat_id, timeout=SEND_TIMEOUT):
+    url = f"https://api.telegram.org/bot{os.getenv('TELEGRAM_BOT_TOKEN')}/sendMessage"
+    # 推送不能重复：POST 且不走重试的 Session，一次调用最多发送一次，耗时上限就是 timeout
+    res = http_client.post(url, json={"chat_id": chat_id, "text": msg}, timeout=timeout, retry=False).json()
+    if not res.get("ok"):
+        error = RetryableError if res.get("error_code") in TELEGRAM_RETRY_CODES else DeliveryError
+        raise error(f"{res.get('error_code')} {res.get('description')}")
+
+
+def send_wechat(msg, touser="@all", toparty=None, totag=None, timeout=SEND_TIMEOUT):
+    data = {
+        "touser": touser,
+        "msgtype": "text",
+        "agentid": int(os.getenv("WX_AGENT_ID")),
+        "text": {"content": msg},
+        "safe": 0
+    }
+    if toparty:
+        data["toparty"] = toparty
+    if totag:
+        data["totag"] = totag
+    # access_token 由 wxtoken 缓存，多次推送/多个脚本共用
+    r = send_app_message(os.getenv("WX_CORP_ID"), os.getenv("WX_SECRET"), data, timeout=timeout)
+    if r is None:
+        # 没拿到 token，消息还没有发送
+        raise RetryableError("企业微信获取access_token失败")
+    if r.get("errcode") != 0:
+        error = RetryableError if r.get("errcode") in TOKEN_EXPIRED_ERRCODES + WECHAT_BUSY_ERRCODES else DeliveryError
+        raise error(f"{r.get('errcode')} {r.get('errmsg')}")
+
+
+# ===================== 渠道配置 =====================
+_extra_channels = []
+
+
+def register_channel(channel):
+    """注册额外的推送渠道"""
+    _extra_channels.append(channel)
+
+
+def configured_channels():
+    channels = []
+    if os.getenv("TELEGRAM_BOT_TOKEN"):
+        for chat_id in (os.getenv("TELEGRAM_CHAT_ID") or "").split(","):
+            chat_id = chat_id.strip()
+            if chat_id:
+                channels.append(Channel(f"telegram:{chat_id}", partial(send_telegram, chat_id=chat_id),
+                                        kind="telegram"))
+    if os.getenv("WX_CORP_ID") and os.getenv("WX_SECRET") and os.getenv("WX_AGENT_ID"):
+        send = partial(send_wechat, touser=os.getenv("WX_TOUSER", "@all"),
+                       toparty=os.getenv("WX_TOPARTY"), totag=os.getenv("WX_TOTAG"))
+        channels.append(Channel("wechat", send, kind="wechat"))
+    return channels + _extra_channels
+
+
+# ===================== 分发 =====================
+def message_for(channel, msg):
+    """按渠道类型取消息，没有对应版本时用 default"""
+    if isinstance(msg, str):
+        return msg
+    return msg.get(channel.kind, msg["default"])
+
+
+def deliver(channel, msg):
+    """发送到单个渠道，可以重试的失败按 backoff 递增间隔重试
+    只重试连接阶段的失败和 RetryableError；其他异常时请求可能已被对方处理，重试会导致重复推送
+    """
+    start = time.monotonic()
+    attempts = 0
+    error = None
+    for attempt in range(channel.retries + 1):
+        attempts += 1
+        try:
+            channel.send(msg, timeout=channel.timeout)
+            error = None
+            break
+        except Exception as e:
+            error = e
+            if not (isinstance(e, RetryableError) or http_client.is_connect_error(e)):
+                break
+            if attempt < channel.retries:
+                time.sleep(channel.backoff * (attempt + 1))
+    return {"channel": channel.name, "ok": error is None, "attempts": attempts,
+            "elapsed": time.monotonic() - start, "error": None if error is None else str(error)}
+
+
+def dispatch(msg, channels=None):
+    """并发推送到所有渠道，返回每个渠道的结果"""
+    if channels is None:
+        channels = configured_channels()
+    if not channels:
+        return []
+    start = time.monotonic()
+    pool = ThreadPoolExecutor(max_workers=len(channels))
+    futures = [(channel, pool.submit(deliver, channel, message_for(channel, msg))) for channel in channels]
+    pool.shutdown(wait=False)
+    results = []
+    for channel, future in futures:
+        try:
+            remaining = max(0, channel.deadline() - (time.monotonic() - start))
+            results.append(future.result(timeout=remaining))
+        except FuturesTimeout:
+            results.append({"channel": channel.name, "ok": False, "attempts": None,
+                            "elapsed": time.monotonic() - start, "error": "超时"})
+    return results
+
+
+def push(msg, channels=None):
+    """推送并在控制台打印每个渠道的结果"""
+    results = dispatch(msg, channels)
+    if not results:
+        print("❌ 推送失败: 没有已配置的推送渠道")
+    for r in results:
+        if r["ok"]:
+            print(f"✅ {r['channel']} 推送成功 ({r['elapsed']:.2f}s)")
+        else:
+            print(f"❌ {r['channel']} 推送失败: {r['error']}")
+    return results
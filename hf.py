@@ -1,7 +1,5 @@
 #!/usr/bin/env python3
-import requests
-import time
-import jwt  # pip install pyjwt
+from qweather import get_jwt_provider, fetch_now, fetch_locations, WEATHER_NOW, AIR_NOW
 
 
 # ===================== 填写你的信息 =====================
@@ -11,38 +9,23 @@ PRIVATE_KEY = """你的私钥"""   # PEM格式Ed25519私钥
 API_HOST = "你的api—host"
 LOCATION = "地区编码"         # 查看和风官网
 CITY_NAME = "城市·区" 
+LOCATIONS = [(LOCATION, CITY_NAME)]   # 多个地区: [("地区编码", "名称"), ...]
 # =======================================================
 
 # 生成JWT
 def generate_jwt(key_id, project_id, private_key):
-    now = int(time.time())
-    payload = {
-        "sub": project_id,
-        "iat": now,
-        "exp": now + 3600
-    }
-    headers = {
-        "alg": "EdDSA",
-        "kid": key_id
-    }
-    token = jwt.encode(payload, private_key, algorithm="EdDSA", headers=headers)
-    return token
+    # 签名结果在有效期内缓存复用，私钥只解析一次
+    return get_jwt_provider(key_id, project_id, private_key).token()
 
 # 获取天气数据
-def get_weather():
+def get_weather(location=LOCATION):
     token = generate_jwt(KEY_ID, PROJECT_ID, PRIVATE_KEY)
-    headers = {"Authorization": f"Bearer {token}"}
-    url = f"https://{API_HOST}/v7/weather/now?location={LOCATION}&gzip=true&lang=zh"
-    res = requests.get(url, headers=headers, timeout=10)
-    return res.json()
+    return fetch_now(API_HOST, WEATHER_NOW, location, token)
 
 # 获取空气质量
-def get_air_quality():
+def get_air_quality(location=LOCATION):
     token = generate_jwt(KEY_ID, PROJECT_ID, PRIVATE_KEY)
-    headers = {"Authorization": f"Bearer {token}"}
-    url = f"https://{API_HOST}/v7/air/now?location={LOCATION}&gzip=true&lang=zh"
-    res = requests.get(url, headers=headers, timeout=10)
-    return res.json()
+    return fetch_now(API_HOST, AIR_NOW, location, token)
 
 # 天气图标
 def weather_icon(text):
@@ -65,11 +48,11 @@ def air_icon(category):
     return icons.get(category, "❓")
 
 # 打印天气信息
-def print_weather(weather_info, air_info):
+def print_weather(weather_info, air_info, city_name=CITY_NAME):
     now = weather_info.get("now", {})
     air_now = air_info.get("now", {})
 
-    print(f"=== {CITY_NAME} 天气与空气质量 ===")
+    print(f"=== {city_name} 天气与空气质量 ===")
     print(f"数据更新时间: {weather_info.get('updateTime','无数据')}  |  空气更新时间: {air_info.get('updateTime','无数据')}")
     #print(f"天气链接: {weather_info.get('fxLink','无链接')}")
     #print(f"空气质量链接: {air_info.get('fxLink','无链接')}")
@@ -87,17 +70,23 @@ def print_weather(weather_info, air_info):
     print("-" * 50)
 
 if __name__ == "__main__":
-    try:
-        weather_info = get_weather()
-        air_info = get_air_quality()
-        
-        if weather_info.get("code") != "200" or "now" not in weather_info:
-            raise ValueError("获取天气失败或返回格式异常")
-        if air_info.get("code") != "200" or "now" not in air_info:
-            raise ValueError("获取空气质量失败或返回格式异常")
-
-        print_weather(weather_info, air_info)
+    # 所有地区并发抓取，共用一个 JWT
+    provider = get_jwt_provider(KEY_ID, PROJECT_ID, PRIVATE_KEY)
+    results = fetch_locations(API_HOST, [code for code, _ in LOCATIONS], provider)
+    for code, name in LOCATIONS:
+        try:
+            weather_info = results[code][WEATHER_NOW]
+            air_info = results[code][AIR_NOW]
+            for info in (weather_info, air_info):
+                if isinstance(info, Exception):
+                    raise info
+            
+            if weather_info.get("code") != "200" or "now" not in weather_info:
+                raise ValueError("获取天气失败或返回格式异常")
+            if air_info.get("code") != "200" or "now" not in air_info:
+                raise ValueError("获取空气质量失败或返回格式异常")
 
-    except Exception as e:
-        print("获取数据失败:", e)
+            print_weather(weather_info, air_info, name)
 
+        except Exception as e:
+            print(f"{name} 获取数据失败:", e)
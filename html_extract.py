@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""网页定向提取：只解析需要的部分，找到目标即停止
+
+有 lxml 时用 HTMLPullParser 分块喂入、边解析边检查事件，头条链接找到后
+不再解析首页剩余部分，文章页解析到第一个 <article> 结束为止；
+没有 lxml 时退回 BeautifulSoup + SoupStrainer，只为目标标签建树。
+提取的文本与 BeautifulSoup 的 get_text(strip=True) 一致。
+lxml / bs4 都在第一次解析时才导入：页面缓存命中（新鲜或 304）的运行用不到解析器。
+"""
+# 每次喂给解析器的字符数，越小越早停止，越大调用开销越小
+CHUNK_SIZE = 16384
+
+etree = None
+_TEXT = None
+_lxml_checked = False
+
+
+def _lxml():
+    """lxml.etree，没有安装时返回 None（用 BeautifulSoup）"""
+    global etree, _TEXT, _lxml_checked
+    if not _lxml_checked:
+        try:
+            from lxml import etree as lxml_etree
+        except ImportError:
+            lxml_etree = None
+        if lxml_etree is not None:
+            # 与 get_text 一致：不含注释、<script>、<style> 中的文字
+            _TEXT = lxml_etree.XPath("descendant-or-self::text()[not(ancestor::script or ancestor::style)]")
+        etree = lxml_etree
+        _lxml_checked = True
+    return etree
+
+
+def _text(el):
+    return "".join(s.strip() for s in _TEXT(el))
+
+
+def _pull(parser, html):
+    """分块喂入并产出解析事件，全部喂完后产出 ("done", 根节点)"""
+    for start in range(0, len(html), CHUNK_SIZE):
+        parser.feed(html[start:start + CHUNK_SIZE])
+        yield from parser.read_events()
+    root = parser.close()
+    yield from parser.read_events()
+    yield "done", root
+
+
+def first_link(html, container="main", container_id="main-content"):
+    """容器（默认 <main id="main-content">）中的第一个 <a>
+    @return: (是否找到容器, href, 链接文字)；容器里没有链接时 href 为 None
+    """
+    etree = _lxml()
+    if etree is None:
+        from bs4 import BeautifulSoup, SoupStrainer
+        soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer(container, id=container_id))
+        box = soup.find(container, id=container_id)
+        if box is None:
+            return False, None, None
+        link = box.find("a")
+        if link is None:
+            return True, None, None
+        return True, link.get("href"), link.get_text(strip=True)
+
+    parser = etree.HTMLPullParser(events=("start", "end"), tag=(container, "a"))
+    box = link = None
+    for event, el in _pull(parser, html):
+        if event == "start":
+            if box is None:
+                if el.tag == container and el.get("id") == container_id:
+                    box = el
+            elif link is None and el.tag == "a":
+                link = el
+        elif event == "end":
+            if el is link:
+                # 链接已完整，首页剩余部分不再解析
+                return True, link.get("href"), _text(link)
+            if el is box:
+                return True, None, None
+    return box is not None, None, None
+
+
+def article_text(html):
+    """文章标题（第一个 <h1>）和段落文字：第一个 <article> 中的 <p>，没有 <article> 时取全部 <p>
+    @return: (标题或 None, [段落文字])
+    """
+    etree = _lxml()
+    if etree is None:
+        from bs4 import BeautifulSoup, SoupStrainer
+        soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer(["h1", "article", "p"]))
+        title_tag = soup.find("h1")
+        article = soup.find("article")
+        paragraphs = (article or soup).find_all("p")
+        return (title_tag.get_text(strip=True) if title_tag else None,
+                [p.get_text(strip=True) for p in paragraphs])
+
+    parser = etree.HTMLPullParser(events=("end",), tag=("h1", "article"))
+    title = article = root = None
+    for event, el in _pull(parser, html):
+        if event == "done":
+            root = el
+        elif el.tag == "h1" and title is None:
+            title = _text(el)
+        elif el.tag == "article" and article is None:
+            article = el
+        if article is not None and title is not None:
+            break
+    if article is None:
+        article = root
+    return title, [_text(p) for p in article.iter("p")]
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""共享 HTTP 客户端
+
+所有对外请求（和风天气、zenquotes、mymemory、Telegram、企业微信、BBC）都走
+同一个 requests.Session：
+  - 按 host 复用连接池并保持 keep-alive，省去重复的 TCP/TLS 握手
+  - 默认连接/读取超时，调用方未指定 timeout 时生效
+  - 连接失败和 429/5xx 自动退避重试；POST 只在连接阶段失败时重试，避免重复推送
+重试约定：默认的 Session 会在读超时、429/5xx 时重发 GET/HEAD，所以 GET 只能用于可以重复的查询；
+推送等不能重复发送的请求一律用 POST，或传 retry=False 走不做任何重试的 Session。
+requests/urllib3 导入约需 80~100 ms，推送脚本每条命令都是新进程，所以推迟到第一次发请求时才导入；
+缓存命中、不联网的运行不付这部分启动开销。
+"""
+import sys
+import threading
+
+# (连接超时, 读取超时)
+DEFAULT_TIMEOUT = (5, 10)
+# 缓存的 host 连接池个数、每个 host 的最大连接数
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 10
+# urllib3 Retry 的参数，建 Session 时才构造
+RETRY = dict(
+    total=3,
+    connect=3,
+    read=2,
+    status=3,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset(["GET", "HEAD"]),
+    raise_on_status=False,
+)
+
+_sessions = {}
+_session_lock = threading.Lock()
+
+
+def new_session(retry=True):
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE,
+                          max_retries=Retry(**RETRY) if retry else 0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(retry=True):
+    """进程内共享的 Session；retry=False 的 Session 不做任何重试，耗时上限就是 timeout"""
+    session = _sessions.get(retry)
+    if session is None:
+        with _session_lock:
+            session = _sessions.get(retry)
+            if session is None:
+                session = _sessions[retry] = new_session(retry)
+    return session
+
+
+def request(method, url, retry=True, **kwargs):
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    return get_session(retry).request(method, url, **kwargs)
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def is_connect_error(exc):
+    """是否为连接阶段的失败（连接被拒、DNS 解析失败、连接超时），此时请求还没有发出去，可以安全重发
+    还没发过请求时 requests 未导入，不可能是连接错误。urllib3 重试用尽时 requests 抛出的是
+    ConnectionError(MaxRetryError(reason=NewConnectionError))，这里沿着包装链查找；
+    读超时、连接中途断开（ProtocolError）等都不算：请求可能已被对方处理
+    """
+    requests = sys.modules.get("requests")
+    if requests is None:
+        return False
+    from urllib3.exceptions import ConnectTimeoutError, MaxRetryError, NewConnectionError
+
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, (requests.exceptions.ConnectTimeout, ConnectTimeoutError, NewConnectionError)):
+            return True
+        if isinstance(exc, MaxRetryError):
+            exc = exc.reason
+            continue
+        # requests 把 urllib3 的异常作为第一个参数包装
+        inner = exc.args[0] if exc.args and isinstance(exc.args[0], BaseException) else None
+        exc = inner or exc.__cause__ or exc.__context__
+    return False
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""常驻任务池：在回调服务进程内执行 main.py / sat.py / bbc.py 的推送逻辑，
+避免每条命令都 fork 一个新的 python3 解释器。"""
+import itertools
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+# 任务状态
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class UnknownJobError(Exception):
+    pass
+
+
+class JobRunner(object):
+    """有界队列 + 固定数量工作线程的任务执行器"""
+
+    def __init__(self, max_workers=2, max_queue=16, history=100):
+        self.max_workers = max_workers
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._registry = {}
+        self._status = OrderedDict()
+        self._history = history
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._workers = []
+        self._started = False
+
+    def register(self, name, func):
+        """注册任务，func 接收 submit 时传入的参数"""
+        self._registry[name] = func
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            for i in range(self.max_workers):
+                t = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+                t.start()
+                self._workers.append(t)
+            self._started = True
+
+    def submit(self, name, *args):
+        """提交任务，返回任务 id；队列已满时抛出 QueueFullError"""
+        if name not in self._registry:
+            raise UnknownJobError(name)
+        self.start()
+        job_id = next(self._ids)
+        record = {"id": job_id, "name": name, "args": list(args), "status": QUEUED,
+                  "submitted": time.time(), "started": None, "finished": None, "error": None}
+        with self._lock:
+            self._status[job_id] = record
+            self._trim()
+        try:
+            self._queue.put_nowait(job_id)
+        except queue.Full:
+            with self._lock:
+                self._status.pop(job_id, None)
+            raise QueueFullError(f"任务队列已满，丢弃 {name}")
+        return job_id
+
+    def status(self, job_id=None):
+        """查询单个任务或全部任务的状态快照"""
+        with self._lock:
+            if job_id is not None:
+                record = self._status.get(job_id)
+                return dict(record) if record else None
+            return [dict(r) for r in self._status.values()]
+
+    def _trim(self):
+        # 只保留最近 history 条已结束的记录，排队/运行中的不清理
+        while len(self._status) > self._history:
+            for job_id, record in self._status.items():
+                if record["status"] in (DONE, FAILED):
+                    del self._status[job_id]
+                    break
+            else:
+                return
+
+    def _worker(self):
+        while True:
+            job_id = self._queue.get()
+            with self._lock:
+                record = self._status.get(job_id)
+                if record is None:
+                    self._queue.task_done()
+                    continue
+                record["status"] = RUNNING
+                record["started"] = time.time()
+                func = self._registry[record["name"]]
+            try:
+                func(*record["args"])
+                status, error = DONE, None
+            except BaseException as e:
+                logging.exception(f"任务 {record['name']}#{job_id} 执行失败")
+                status, error = FAILED, repr(e)
+            with self._lock:
+                record["status"] = status
+                record["error"] = error
+                record["finished"] = time.time()
+            logging.info(f"任务 {record['name']}#{job_id} {status}, 耗时 {record['finished'] - record['started']:.2f}s")
+            self._queue.task_done()
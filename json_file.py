@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""多个进程共用的落盘 JSON 文件
+
+  - load() 只在文件变化后才重新读取，用 (st_mtime_ns, 大小, inode) 判断，同一时间刻度内的两次写入也能发现
+  - update() 在文件锁内读出最新内容、交给调用方合并后写回，并发写入的进程不会互相覆盖
+  - 写入先写临时文件再 os.replace，读的一方总是看到完整的文件
+"""
+import json
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # 非 POSIX 平台不做跨进程互斥
+    fcntl = None
+
+
+class JsonFile(object):
+    """path 为 JSON 文件路径；锁文件为 path + ".lock"，写入时文件权限为 mode"""
+
+    def __init__(self, path, mode=0o644):
+        self.path = path
+        self.mode = mode
+        self._stamp = None
+
+    def load(self, force=False):
+        """读出文件内容；自上次读写后没有变化（force 为假时）、文件不存在或损坏时返回 None"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stamp = _stamp(os.fstat(f.fileno()))
+                if not force and stamp == self._stamp:
+                    return None
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._stamp = stamp
+        return data
+
+    def save(self, data):
+        """原子地写入文件，失败时抛出 OSError；多个进程都会写时应在 lock() 内调用"""
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, self.mode)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+                f.flush()
+                stamp = _stamp(os.fstat(f.fileno()))
+            os.replace(tmp, self.path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        self._stamp = stamp
+
+    def update(self, merge):
+        """文件锁内：merge(文件当前内容，没有或损坏时为 None) 返回要写回的数据，写回后返回该数据"""
+        with self.lock():
+            data = merge(self.load(force=True))
+            self.save(data)
+            return data
+
+    def lock(self):
+        """跨进程互斥的上下文管理器；同一线程内不可重入"""
+        return _FileLock(f"{self.path}.lock")
+
+
+def _stamp(st):
+    # os.replace 不改变文件本身的 mtime 和 inode，写入后取到的就是 path 之后的状态
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class _FileLock(object):
+    """fcntl.flock 文件锁，拿不到锁（无 fcntl、锁文件打不开）时不互斥"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            try:
+                self._file = open(self.path, "a")
+                fcntl.flock(self._file, fcntl.LOCK_EX)
+            except OSError:
+                self._file = None
+        return self
+
+    def __exit__(self, *exc):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
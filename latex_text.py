@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""LaTeX 转可读文本：单遍扫描的递归下降翻译器
+
+覆盖题库里用到的 LaTeX 子集：$...$ / $$...$$、\\frac、\\sqrt、\\left/\\right、
+上下标、\\text 等，以及可扩展的符号表。正确处理嵌套花括号，
+按完整命令名匹配（\\leq 不会被当成 \\le），结果按输入缓存。
+"""
+import re
+from functools import lru_cache
+
+# 命令名 -> 文本，可通过 LatexTranslator(symbols=...) 或 register_symbol 扩展
+DEFAULT_SYMBOLS = {
+    # 运算符
+    "cdot": "*", "times": "*", "div": "/", "pm": "+/-", "mp": "-/+", "ast": "*",
+    # 关系符号
+    "le": "<=", "leq": "<=", "leqslant": "<=", "ge": ">=", "geq": ">=", "geqslant": ">=",
+    "ne": "!=", "neq": "!=", "approx": "approx", "equiv": "==", "sim": "~",
+    "lt": "<", "gt": ">",
+    # 其他常用符号
+    "infty": "inf", "circ": "°", "degree": "°", "angle": "∠", "triangle": "△",
+    "perp": "⊥", "parallel": "∥", "overline": "", "ldots": "...", "cdots": "...", "dots": "...",
+    "rightarrow": "->", "to": "->", "leftarrow": "<-", "Rightarrow": "=>", "iff": "<=>",
+    "in": "in", "cup": "∪", "cap": "∩", "sum": "sum", "prod": "prod",
+    "lbrace": "{", "rbrace": "}", "langle": "<", "rangle": ">", "vert": "|", "lvert": "|", "rvert": "|",
+    "quad": " ", "qquad": " ",
+    # 希腊字母
+    "alpha": "alpha", "beta": "beta", "gamma": "gamma", "delta": "delta", "Delta": "Delta",
+    "epsilon": "epsilon", "theta": "theta", "lambda": "lambda", "mu": "mu", "pi": "pi",
+    "rho": "rho", "sigma": "sigma", "Sigma": "Sigma", "tau": "tau", "phi": "phi", "omega": "omega",
+    "Omega": "Omega",
+    # 单字符命令
+    ",": " ", ";": " ", ":": " ", "!": "", " ": " ", "\\": " ",
+    "{": "{", "}": "}", "$": "$", "%": "%", "&": "&", "#": "#", "_": "_", "|": "|",
+}
+
+# 只取参数内容的命令
+TEXT_COMMANDS = frozenset(["text", "textrm", "textbf", "textit", "mathrm", "mathbf", "mathit",
+                           "operatorname", "mbox", "boxed"])
+FRAC_COMMANDS = frozenset(["frac", "dfrac", "tfrac"])
+# 不输出任何内容的命令（连同一个参数）
+DROP_COMMANDS = frozenset(["begin", "end", "label"])
+
+# 一次 split 把字符串切成 [文本, 记号, 文本, 记号, ...]，记号为命令、$/$$、花括号和上下标
+# 每个分支都以单个字符开头（不用 [{}^_] 字符类），re 据此只在这几个字符处尝试匹配，split 快约 40%
+_TOKEN = re.compile(r"(\\(?:[A-Za-z]+|.)|\$\$?|\{|\}|\^|_)", re.S)
+_ATOM = re.compile(r"[\w.]+")
+_SCRIPT_ATOM = re.compile(r"\d+(?:\.\d+)?|\w")
+# 需要读取参数的命令
+_LEFT_RIGHT = frozenset(["left", "right", "big", "Big", "bigl", "bigr"])
+
+
+def _wrap(text, atom=_ATOM):
+    """分子分母、上下标不是单个数字/变量时加括号"""
+    return text if atom.fullmatch(text) else f"({text})"
+
+
+class _Parser(object):
+    """一次翻译调用的状态，不在线程间共享
+
+    toks 为 _TOKEN.split 的结果，偶数下标是普通文本，奇数下标是记号；
+    读取参数时会就地截短后面的文本片段
+    """
+
+    def __init__(self, symbols, toks, math=None):
+        self.symbols = symbols
+        self.toks = toks
+        self.n = len(toks)
+        self.i = 0
+        self.math = math  # 当前所在公式的定界符
+        self.last = {}  # 定界符 -> 它最后一次出现的下标，第一次遇到该定界符时才计算
+
+    def parse(self, closing=False):
+        """解析到匹配的 "}"（closing 为真时）或记号结束"""
+        toks, n, symbols = self.toks, self.n, self.symbols
+        out = []
+        append = out.append
+        i = self.i
+        while i < n:
+            text = toks[i]
+            if text:
+                append(text)
+            if i + 1 >= n:
+                i += 1
+                break
+            t = toks[i + 1]
+            i += 2
+            c = t[0]
+            if c == "\\":
+                name = t[1:]
+                text = symbols.get(name)
+                if text is not None:
+                    append(text)
+                    continue
+                self.i = i
+                append(self.command(name))
+                i = self.i
+            elif c == "$":
+                self.i = i
+                append(self.dollar(t))
+            elif c == "{":
+                self.i = i
+                append(self.parse(True))
+                i = self.i
+            elif c == "}":
+                if closing:
+                    self.i = i
+                    return "".join(out)
+                append(c)
+            else:  # ^ _
+                self.i = i
+                append(c + _wrap(self.argument(), _SCRIPT_ATOM))
+                i = self.i
+        self.i = i
+        return "".join(out)
+
+    def dollar(self, delim):
+        """成对的 $ / $$ 去掉，落单的 $ 原样保留（如金额 "$5"）
+        调用前 self.i 须已指向该定界符之后的文本片段；后面还有同样的定界符时才算公式开始，
+        与最后一次出现的下标比较即可，每个字符串只查找一次
+        """
+        if self.math == delim:
+            self.math = None
+            return ""
+        if self.math is None:
+            last = self.last.get(delim)
+            if last is None:
+                # 文本片段里不会有 "$"，从后往前第一个等于 delim 的元素就是最后一个该定界符
+                last = self.last[delim] = self.n - 1 - self.toks[::-1].index(delim)
+            if last >= self.i:
+                self.math = delim
+                return ""
+        return delim
+
+    def argument(self):
+        """读取一个参数：{...} 或单个字符/命令"""
+        toks, i = self.toks, self.i
+        # 当前位置若是文本片段，跳过前导空格后取第一个字符
+        if i < self.n:
+            text = toks[i].lstrip(" ")
+            if text:
+                toks[i] = text[1:]
+                return text[0]
+        if i + 1 >= self.n:
+            self.i = self.n
+            return ""
+        t = toks[i + 1]
+        self.i = i + 2
+        if t == "{":
+            # 最常见的 {2}、{x+1}：花括号里只有文本，不必递归
+            if i + 3 < self.n and toks[i + 3] == "}":
+                self.i = i + 4
+                return toks[i + 2]
+            return self.parse(True)
+        if t[0] == "\\":
+            name = t[1:]
+            text = self.symbols.get(name)
+            return text if text is not None else self.command(name)
+        if t[0] == "$":
+            return self.dollar(t)
+        return t
+
+    def optional(self):
+        """读取紧跟的 [..] 可选参数，没有则返回 None"""
+        if self.i < self.n:
+            text = self.toks[self.i]
+            if text.startswith("["):
+                end = text.find("]")
+                if end != -1:
+                    self.toks[self.i] = text[end + 1:]
+                    return _Parser(self.symbols, _TOKEN.split(text[1:end]), self.math).parse()
+        return None
+
+    def command(self, name):
+        if name in FRAC_COMMANDS:
+            num = self.argument()
+            den = self.argument()
+            return f"{_wrap(num)}/{_wrap(den)}"
+        if name == "sqrt":
+            index = self.optional()
+            radicand = self.argument()
+            return f"sqrt({radicand})" if index is None else f"root({index}, {radicand})"
+        if name in _LEFT_RIGHT:
+            if self.i < self.n:
+                text = self.toks[self.i].lstrip(" ")
+                if text.startswith("."):
+                    self.toks[self.i] = text[1:]
+                    return ""
+            return self.argument()
+        if name in TEXT_COMMANDS:
+            return self.argument()
+        if name in DROP_COMMANDS:
+            self.argument()
+            return ""
+        # 未知命令去掉反斜杠，与旧实现一致
+        return name
+
+
+class LatexTranslator(object):
+    """LaTeX 转文本，带 LRU 缓存"""
+
+    def __init__(self, symbols=None, cache_size=4096):
+        self.symbols = dict(DEFAULT_SYMBOLS)
+        if symbols:
+            self.symbols.update(symbols)
+        self._cached = lru_cache(maxsize=cache_size)(self._translate)
+
+    def register_symbol(self, name, text):
+        self.symbols[name] = text
+        self._cached.cache_clear()
+
+    def translate(self, s):
+        if not isinstance(s, str):
+            return s
+        return self._cached(s)
+
+    def _translate(self, s):
+        toks = _TOKEN.split(s)
+        if len(toks) == 1:
+            return s
+        return _Parser(self.symbols, toks).parse()
+
+
+_default = LatexTranslator()
+
+
+def latex_to_text(s: str) -> str:
+    """将 LaTeX 表达式转换为可读文本形式，可扩展"""
+    return _default.translate(s)
+
+
+def register_symbol(name, text):
+    """给默认翻译器增加或覆盖符号"""
+    _default.register_symbol(name, text)
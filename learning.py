@@ -1,32 +1,19 @@
-#!/usr/bin/env python
-# -*- coding: utf-8 -*-
-#########################################################################
-# Author: jonyqin
-# Created Time: Thu 11 Sep 2014 01:53:58 PM CST
-# File Name: ierror.py
-# Description:定义错误码含义 
-#########################################################################
-WXBizMsgCrypt_OK = 0
-WXBizMsgCrypt_ValidateSignature_Error = -40001
-WXBizMsgCrypt_ParseXml_Error = -40002
-WXBizMsgCrypt_ComputeSignature_Error = -40003
-WXBizMsgCrypt_IllegalAesKey = -40004
-WXBizMsgCrypt_ValidateCorpid_Error = -40005
-WXBizMsgCrypt_EncryptAES_Error = -40006
-WXBizMsgCrypt_DecryptAES_Error = -40007
-WXBizMsgCrypt_IllegalBuffer = -40008
-WXBizMsgCrypt_EncodeBase64_Error = -40009
-WXBizMsgCrypt_DecodeBase64_Error = -40010
-WXBizMsgCrypt_GenReturnXml_Error = -40011
-
-root@ubuntu:/home/learning# cat learning.py
 from WXBizMsgCrypt import WXBizMsgCrypt
-from flask import Flask, request, make_response
-import subprocess
+from flask import Flask, request, make_response, jsonify
 import logging
 import xml.etree.ElementTree as ET
 from dotenv import load_dotenv
 import os
+import threading
+from collections import OrderedDict
+
+from jobs import JobRunner, QueueFullError
+import main as daily_job
+import sat as sat_job
+import bbc as bbc_job
+import quotes
+from question_store import get_loader
+from question_render import RENDERERS, RENDER_VERSION
 
 app = Flask(__name__)
 
@@ -42,6 +29,97 @@ crypto = WXBizMsgCrypt(TOKEN, ENCODING_AES_KEY, CORP_ID)
 logging.basicConfig(level=logging.DEBUG)
 logging.getLogger('werkzeug').setLevel(logging.DEBUG)
 
+# 常驻任务池：命令在进程内执行，不再每条消息启动一个 python3
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "16"))
+
+runner = JobRunner(max_workers=JOB_WORKERS, max_queue=JOB_QUEUE_SIZE)
+runner.register("start", daily_job.main)
+runner.register("sat", sat_job.main)
+runner.register("bbc", bbc_job.main)
+
+QUESTION_RELOAD_INTERVAL = int(os.getenv("QUESTION_RELOAD_INTERVAL", "30"))
+
+
+def start_background_tasks():
+    # 题库热更新：后台定期检查 questions.json，内容变化时重建索引并原子替换，进行中的出题不受影响
+    get_loader(sat_job.QUESTION_FILE, sat_job.QUESTION_STORE, RENDERERS, RENDER_VERSION).watch(QUESTION_RELOAD_INTERVAL)
+    # 每日一句后台预取：推送时直接读本地语料库，不在请求路径上访问 zenquotes / MyMemory
+    quotes.start_prefetcher()
+
+
+# app.run(debug=True) 会启用 Werkzeug reloader：父进程只监视文件、重启子进程，不处理请求，
+# 后台任务只在处理请求的进程里启动（子进程带 WERKZEUG_RUN_MAIN=true；被 WSGI 服务器导入时直接启动）
+if __name__ != '__main__' or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+    start_background_tasks()
+
+
+def submit_job(name, *args):
+    try:
+        job_id = runner.submit(name, *args)
+        logging.info(f"已提交任务 {name}#{job_id} {' '.join(args)}")
+    except QueueFullError as e:
+        logging.error(f"提交任务 {name} 失败: {e}")
+
+
+# ===================== 回调消息队列 =====================
+# 回调里只验签、解密、解析出字段，放入消息队列后立即回复 success；日志、命令解析和提交任务
+# 由消费线程完成，应答耗时与任务多少无关。企业微信 5 秒内收不到应答会重试，重试的消息
+# MsgId 相同，按最近收到的 MsgId 去重；队列已满时回复 503，让企业微信稍后重试
+MESSAGE_WORKERS = int(os.getenv("MESSAGE_WORKERS", "2"))
+MESSAGE_QUEUE_SIZE = int(os.getenv("MESSAGE_QUEUE_SIZE", "256"))
+RECENT_MESSAGES = 1024
+
+_recent_messages = OrderedDict()
+_recent_lock = threading.Lock()
+
+
+def parse_message(decrypted_xml):
+    """解密后的消息 XML -> {标签: 文本}"""
+    return {child.tag: child.text for child in ET.fromstring(decrypted_xml)}
+
+
+def message_key(msg):
+    # 事件消息没有 MsgId，用发送者 + 时间 + 事件区分
+    return msg.get('MsgId') or (msg.get('FromUserName'), msg.get('CreateTime'), msg.get('Event'))
+
+
+def is_duplicate(msg):
+    """同一条消息是否已经收到过，没收到过时记下"""
+    key = message_key(msg)
+    with _recent_lock:
+        if key in _recent_messages:
+            return True
+        _recent_messages[key] = True
+        if len(_recent_messages) > RECENT_MESSAGES:
+            _recent_messages.popitem(last=False)
+    return False
+
+
+def handle_message(msg):
+    """消费线程：按消息内容提交任务"""
+    logging.debug(f"处理消息: {msg}")
+    msg_type = msg.get('MsgType') or 'unknown'
+
+    if msg_type == 'text':
+        content = (msg.get('Content') or '').strip()
+        logging.info(f"收到文本消息: {content}")
+
+        # 命令后可带参数，例如 "sat hard algebra" 按难度/分类抽题
+        command, _, args = content.partition(" ")
+        command = command.lower()
+        args = args.strip()
+        if command == "sat" and args:
+            submit_job(command, args)
+        elif command in ("start", "sat", "bbc"):
+            submit_job(command)
+    else:
+        logging.info(f"收到非文本消息，类型: {msg_type}")
+
+
+inbox = JobRunner(max_workers=MESSAGE_WORKERS, max_queue=MESSAGE_QUEUE_SIZE)
+inbox.register("message", handle_message)
+
 
 # 路由改成 /wechat_callback，与企业微信后台保持一致
 @app.route('/wechat_callback', methods=['GET', 'POST'])
@@ -71,48 +149,35 @@ def wechat_callback():
         xml_data = request.data
 
         logging.debug(f"POST params - msg_signature: {msg_signature}, timestamp: {timestamp}, nonce: {nonce}")
-        logging.debug(f"POST data: {xml_data}")
 
         ret, decrypted_xml = crypto.DecryptMsg(xml_data, msg_signature, timestamp, nonce)
-        logging.debug(f"DecryptMsg ret: {ret}, decrypted_xml: {decrypted_xml}")
         if ret != 0:
+            logging.debug(f"DecryptMsg ret: {ret}")
             return "解密失败", 400
 
-        # 解析 XML
-        xml_tree = ET.fromstring(decrypted_xml)
-        msg_type = xml_tree.find('MsgType').text if xml_tree.find('MsgType') is not None else 'unknown'
-
-        if msg_type == 'text':
-            content = xml_tree.find('Content').text.strip()
-            logging.info(f"收到文本消息: {content}")
-
-            # 如果消息是 "nba"，直接执行 nba.py，不捕获输出
-            if content.lower() == "start":
-                try:
-                    subprocess.Popen(["python3", "/home/learning/main.py"])
-                    logging.info("已触发 main.py 执行")
-                except Exception as e:
-                    logging.error(f"执行 main.py 失败: {e}")
-             
-            if content.lower() == "sat":
-                try:
-                    subprocess.Popen(["python3", "/home/learning/sat.py"])
-                    logging.info("已触发 sat.py 执行")
-                except Exception as e:
-                    logging.error(f"执行 sat.py 失败: {e}")
-            
-            if content.lower() == "bbc":
-                try:
-                    subprocess.Popen(["python3", "/home/learning/bbc.py"])
-                    logging.info("已触发 bbc.py 执行")
-                except Exception as e:
-                    logging.error(f"执行 bbc.py 失败: {e}")
-        else:
-            logging.info(f"收到非文本消息，类型: {msg_type}")
+        # 解析出字段后入队即应答，日志和命令分发在消费线程里做
+        msg = parse_message(decrypted_xml)
+        if is_duplicate(msg):
+            logging.info(f"忽略重复投递的消息 {msg.get('MsgId')}")
+            return "success"
+        try:
+            inbox.submit("message", msg)
+        except QueueFullError as e:
+            logging.error(f"消息队列已满，暂不处理消息: {e}")
+            # 不回复 success，企业微信会重试；这条消息不算收到过，重试时不会被当成重复投递
+            with _recent_lock:
+                _recent_messages.pop(message_key(msg), None)
+            return "消息队列已满", 503
 
         return "success"
 
 
+# 查询任务状态
+@app.route('/jobs', methods=['GET'])
+def job_status():
+    return jsonify(runner.status())
+
+
 if __name__ == '__main__':
     # 使用 0.0.0.0 允许公网访问
     app.run(host='0.0.0.0', port=8081, debug=True, threaded=True)
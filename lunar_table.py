@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""农历/节气/节假日预计算表
+
+cnlunar.Lunar 每次都会算八字、生肖、节气等大量用不到的内容，节假日还要线性扫描列表。
+这里预先为一段年份的每一天算好用到的几项，存成紧凑的二进制表，查询按日期序数直接取下标，
+热路径上不需要导入 cnlunar；超出表范围或表不存在时才现算当天。
+
+文件结构（小端）:
+  头部      magic(4s) version(H) fields(H) start(I) days(I) strings_length(I)
+  字符串表  JSON 数组，下标 0 为空串
+  日期表    days * fields 个 uint16，第 i 天的各字段是字符串表下标
+
+用法: python3 lunar_table.py [起始年] [结束年] [输出文件]
+"""
+import json
+import os
+import struct
+import sys
+import threading
+from array import array
+from datetime import date, datetime
+
+LUNAR_TABLE_FILE = "/home/learning/lunar_table.bin"
+MAGIC = b"LUNR"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIII")
+# 每天保存的字段
+FIELDS = ("lunar_year", "lunar_month", "lunar_day", "solar_term", "legal_holiday", "lunar_holiday")
+
+
+class TableFormatError(Exception):
+    pass
+
+
+# ===================== 计算单日 =====================
+def compute_day(day):
+    """用 cnlunar 计算一天的各字段（生成表和表外日期时使用）"""
+    import cnlunar
+    from cnlunar.holidays import legalHolidaysDic, legalLunarHolidaysDic, otherHolidaysList, otherLunarHolidaysList
+
+    a = cnlunar.Lunar(datetime(day.year, day.month, day.day))
+    lunar_month_day = (a.lunarMonth, a.lunarDay)
+
+    legal_holiday = legalHolidaysDic.get((day.month, day.day)) or legalLunarHolidaysDic.get(lunar_month_day)
+    if not legal_holiday:
+        for month_day_dict in otherHolidaysList:
+            if day.month in month_day_dict and day.day == month_day_dict[day.month]:
+                legal_holiday = month_day_dict[day.month]
+                break
+
+    lunar_holiday = None
+    for month_day_dict in otherLunarHolidaysList:
+        if lunar_month_day in month_day_dict:
+            lunar_holiday = month_day_dict[lunar_month_day]
+            break
+
+    solar_term = a.todaySolarTerms if a.todaySolarTerms and a.todaySolarTerms != "无" else None
+    return {
+        "lunar_year": f"{a.lunarYearCn} {a.year8Char}[{a.chineseYearZodiac}]年",
+        "lunar_month": a.lunarMonthCn,
+        "lunar_day": a.lunarDayCn,
+        "solar_term": solar_term,
+        "legal_holiday": legal_holiday,
+        "lunar_holiday": lunar_holiday,
+    }
+
+
+# ===================== 生成 =====================
+def build_table(start_year, end_year, path=LUNAR_TABLE_FILE):
+    """生成 [start_year, end_year] 每一天的表，返回天数"""
+    start = date(start_year, 1, 1).toordinal()
+    end = date(end_year, 12, 31).toordinal()
+    strings = [""]
+    string_ids = {"": 0}
+    values = array("H")
+    for ordinal in range(start, end + 1):
+        info = compute_day(date.fromordinal(ordinal))
+        for field in FIELDS:
+            text = info[field] or ""
+            if text not in string_ids:
+                string_ids[text] = len(strings)
+                strings.append(text)
+            values.append(string_ids[text])
+    if sys.byteorder != "little":
+        values.byteswap()
+    blob = json.dumps(strings, ensure_ascii=False).encode("utf-8")
+    days = end - start + 1
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(FIELDS), start, days, len(blob)))
+        f.write(blob)
+        f.write(values.tobytes())
+    os.replace(tmp, path)
+    return days
+
+
+# ===================== 查询 =====================
+class LunarTable(object):
+    def __init__(self, path=LUNAR_TABLE_FILE):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, fields, self.start, self.days, strings_length = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION or fields != len(FIELDS):
+            raise TableFormatError(f"{path} 不是农历表或版本不匹配")
+        at = HEADER.size
+        self.strings = json.loads(data[at:at + strings_length].decode("utf-8"))
+        self.values = array("H")
+        self.values.frombytes(data[at + strings_length:at + strings_length + 2 * fields * self.days])
+        if sys.byteorder != "little":
+            self.values.byteswap()
+
+    def get(self, day):
+        """返回 {字段: 值}，没有的字段为 None；日期不在表内时返回 None"""
+        i = day.toordinal() - self.start
+        if not 0 <= i < self.days:
+            return None
+        n = len(FIELDS)
+        row = self.values[i * n:(i + 1) * n]
+        return {field: self.strings[k] or None for field, k in zip(FIELDS, row)}
+
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def get_table():
+    """进程内共享的表，位置可用 LUNAR_TABLE 环境变量覆盖；文件不存在或格式不对时返回 None"""
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                try:
+                    _table = LunarTable(os.getenv("LUNAR_TABLE", LUNAR_TABLE_FILE))
+                except (OSError, ValueError, struct.error, TableFormatError):
+                    _table = False
+    return _table or None
+
+
+def lunar_day(day=None):
+    """某天（默认今天）的农历、节气、节假日；优先查表，表外现算"""
+    day = day or date.today()
+    if isinstance(day, datetime):
+        day = day.date()
+    table = get_table()
+    info = table.get(day) if table else None
+    return info if info is not None else compute_day(day)
+
+
+if __name__ == "__main__":
+    this_year = date.today().year
+    start_year = int(sys.argv[1]) if len(sys.argv) > 1 else this_year - 1
+    end_year = int(sys.argv[2]) if len(sys.argv) > 2 else this_year + 10
+    out = sys.argv[3] if len(sys.argv) > 3 else LUNAR_TABLE_FILE
+    n = build_table(start_year, end_year, out)
+    print(f"已生成 {out}，{start_year}-{end_year} 共 {n} 天")
@@ -1,16 +1,16 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import re
-import requests
 import time
-import jwt  
-import json
-import random
+from qweather import get_jwt_provider, fetch_now, fetch_locations, ResponseCache, WEATHER_NOW, AIR_NOW
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
 from dotenv import load_dotenv
-import os
-import cnlunar
-from cnlunar.holidays import legalHolidaysDic, legalLunarHolidaysDic, otherHolidaysList, otherLunarHolidaysList
+from delivery import push
+from question_store import open_store
+from quotes import daily_quote
+from question_render import RENDERERS, RENDER_VERSION, digest_header, digest_section, render_digest
+from question_scheduler import QuestionScheduler
+from lunar_table import lunar_day
 
 load_dotenv()  # 加载 .env 文件
 
@@ -21,33 +21,33 @@ PRIVATE_KEY = """你的私钥"""
 API_HOST = "你的api-host"
 LOCATION = "城市代码"       #查看和风官网
 CITY_NAME = "城市·区"
+# 多地区模式：[(地区代码, 名称), ...]，并发抓取后合并成一个天气板块
+LOCATIONS = [(LOCATION, CITY_NAME)]
 QUESTION_FILE = "/home/learning/questions.json"
-TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
-TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
-WX_CORP_ID = os.getenv("WX_CORP_ID")
-WX_AGENT_ID = os.getenv("WX_AGENT_ID")
-WX_SECRET = os.getenv("WX_SECRET")
+QUESTION_STORE = "/home/learning/questions.qbin"   # 题库索引（含预渲染结果），由 question_render.py 生成
+SCHEDULE_STATE = "/home/learning/question_state.json"   # 出题进度，保证一轮内不重复
+WEATHER_CACHE_FILE = "/home/learning/weather_cache.json"   # 天气缓存，多次运行共用
 
 # ===================== JWT生成 =====================
 def generate_jwt(key_id, project_id, private_key):
-    now = int(time.time())
-    payload = {"sub": project_id, "iat": now, "exp": now + 3600}
-    headers = {"alg": "EdDSA", "kid": key_id}
-    token = jwt.encode(payload, private_key, algorithm="EdDSA", headers=headers)
-    return token
+    # 签名结果在有效期内缓存复用，私钥只解析一次
+    return get_jwt_provider(key_id, project_id, private_key).token()
 
 # ===================== 天气信息 =====================
-def get_weather():
+def get_weather(location=LOCATION):
     token = generate_jwt(KEY_ID, PROJECT_ID, PRIVATE_KEY)
-    headers = {"Authorization": f"Bearer {token}"}
-    url = f"https://{API_HOST}/v7/weather/now?location={LOCATION}&gzip=true&lang=zh"
-    return requests.get(url, headers=headers, timeout=10).json()
+    return fetch_now(API_HOST, WEATHER_NOW, location, token)
 
-def get_air_quality():
+def get_air_quality(location=LOCATION):
     token = generate_jwt(KEY_ID, PROJECT_ID, PRIVATE_KEY)
-    headers = {"Authorization": f"Bearer {token}"}
-    url = f"https://{API_HOST}/v7/air/now?location={LOCATION}&gzip=true&lang=zh"
-    return requests.get(url, headers=headers, timeout=10).json()
+    return fetch_now(API_HOST, AIR_NOW, location, token)
+
+weather_cache = ResponseCache(WEATHER_CACHE_FILE)
+
+def get_weather_batch(locations=LOCATIONS):
+    """并发抓取所有地区的天气和空气质量，按 updateTime 缓存"""
+    provider = get_jwt_provider(KEY_ID, PROJECT_ID, PRIVATE_KEY)
+    return fetch_locations(API_HOST, [code for code, _ in locations], provider, cache=weather_cache)
 
 def weather_icon(text):
     icons = {"晴":"☀️","多云":"⛅","阴":"☁️","雨":"🌧️","雪":"❄️","雷":"⛈️"}
@@ -74,205 +74,133 @@ def format_weather(weather_info, air_info):
     text += "-"*30 + "\n\n"
     return text
 
+def format_weather_section(lunar_info, results, locations=LOCATIONS):
+    """合并多个地区的天气；单地区时输出与原来一致，失败直接抛出"""
+    if len(locations) == 1:
+        text = f"======== {locations[0][1]} =======\n"
+    else:
+        text = f"======== {' | '.join(name for _, name in locations)} =======\n"
+    text += lunar_info + "\n"
+    for code, name in locations:
+        data = results.get(code, {})
+        error = next((v for v in data.values() if isinstance(v, Exception)), None)
+        if error is not None:
+            if len(locations) == 1:
+                raise error
+            text += f"📍 {name}\n❌ 获取天气失败: {error}\n\n"
+            continue
+        if len(locations) > 1:
+            text += f"📍 {name}\n"
+        text += format_weather(data.get(WEATHER_NOW, {}), data.get(AIR_NOW, {}))
+    return text
+
 # ===================== 农历信息 =====================
 def get_lunar_info():
+    # 查预计算的农历表（lunar_table.py 生成），表外日期才用 cnlunar 现算
     today = datetime.today()
-    a = cnlunar.Lunar(today)
-    
-    def check_legal_holiday(date):
-        if (date.month, date.day) in legalHolidaysDic:
-            return legalHolidaysDic[(date.month, date.day)]
-        lunar_month_day = (a.lunarMonth, a.lunarDay)
-        if lunar_month_day in legalLunarHolidaysDic:
-            return legalLunarHolidaysDic[lunar_month_day]
-        for month_day_dict in otherHolidaysList:
-            if date.month in month_day_dict and date.day == month_day_dict[date.month]:
-                return month_day_dict[date.month]
-        return None
-
-    def check_other_lunar_holiday(date):
-        lunar_month_day = (a.lunarMonth, a.lunarDay)
-        for month_day_dict in otherLunarHolidaysList:
-            if lunar_month_day in month_day_dict:
-                return month_day_dict[lunar_month_day]
-        return None
-
-    legal_holiday = check_legal_holiday(today)
-    other_lunar_holiday = check_other_lunar_holiday(today)
-    
+    info = lunar_day(today)
+
     dic = {
         '日期': today.strftime('%Y-%m-%d'),
-        '农历': f"{a.lunarYearCn} {a.year8Char}[{a.chineseYearZodiac}]年 {a.lunarMonthCn}{a.lunarDayCn}"
+        '农历': f"{info['lunar_year']} {info['lunar_month']}{info['lunar_day']}"
     }
-    
-    if a.todaySolarTerms and a.todaySolarTerms != "无":
-        dic['节气'] = a.todaySolarTerms
-    if legal_holiday:
-        dic['法定节假日'] = legal_holiday
-    if other_lunar_holiday:
-        dic['农历节假日'] = other_lunar_holiday
-
-    lunar_info = ""
-    for key, value in dic.items():
-        lunar_info += f"{key}: {value}\n"
-    
-    return lunar_info
 
-# ===================== 每日一句 =====================
-def get_daily_quote():
-    try:
-        response = requests.get("https://zenquotes.io/api/today")
-        data = response.json()
-        quote = data[0]["q"]
-        author = data[0]["a"]
-        return quote, author
-    except:
-        return "无数据", "无数据"
+    if info['solar_term']:
+        dic['节气'] = info['solar_term']
+    if info['legal_holiday']:
+        dic['法定节假日'] = info['legal_holiday']
+    if info['lunar_holiday']:
+        dic['农历节假日'] = info['lunar_holiday']
 
-def translate_to_chinese(text):
-    try:
-        url = "https://api.mymemory.translated.net/get"
-        params = {"q": text, "langpair": "en|zh-CN"}
-        res = requests.get(url, params=params)
-        return res.json()["responseData"]["translatedText"]
-    except:
-        return "无数据"
+    return "".join(f"{key}: {value}\n" for key, value in dic.items())
 
+# ===================== 每日一句 =====================
 def format_quote():
-    en, author = get_daily_quote()
-    cn = translate_to_chinese(en)
+    # 名言和译文由 quotes.py 预取到本地语料库，zenquotes 不可用时用语料库里的旧名言
+    en, author, cn = daily_quote()
     text = f"🌞 每日一句\n\n"
-    text += f"英文: {en}\n\n中文: {cn}\n\n作者: {author}\n\n"
+    text += f"英文: {en or '无数据'}\n\n中文: {cn or '无数据'}\n\n作者: {author or '无数据'}\n\n"
     return text
 
 # ===================== SAT题 =====================
 # 开关：是否对 LaTeX 进行文本化处理
 USE_LATEX_TEXT = True
 
-def latex_to_text(s: str) -> str:
-    """将 LaTeX 表达式转换为可读文本形式，可扩展"""
-    if not isinstance(s, str):
-        return s
-    # 分式: \frac{a}{b} -> a/b
-    s = re.sub(r"\\frac\{([^}]*)\}\{([^}]*)\}", r"\1/\2", s)
-    # 括号替换
-    s = s.replace(r"\left(", "(").replace(r"\right)", ")")
-    # 行内/块公式标记移除
-    s = re.sub(r"\$\$(.*?)\$\$", r"\1", s)
-    s = re.sub(r"\$(.*?)\$", r"\1", s)
-    # 根号 sqrt
-    s = re.sub(r"\\sqrt\{([^}]*)\}", r"sqrt(\1)", s)
-    # 乘号
-    s = s.replace(r"\cdot", "*").replace(r"\times", "*")
-    # 常见关系符号
-    s = s.replace(r"\le", "<=").replace(r"\ge", ">=")
-    s = s.replace(r"\neq", "!=").replace(r"\approx", "approx")
-    # 常用希腊字母
-    s = s.replace(r"\pi", "pi")
-    # 分隔符处理
-    s = s.replace(r"\,", " ").replace(r"\;", " ")
-    # 去除多余反斜杠
-    s = s.replace("\\", "")
-    return s
-
 def load_questions():
-    with open(QUESTION_FILE,"r",encoding="utf-8") as f:
-        data = json.load(f)
-    all_q = []
-    for k,v in data.items():
-        all_q.extend(v)
-    return all_q
+    # mmap 打开预先建好的索引文件，题目已预渲染，抽题时只读取选中的一条
+    return open_store(QUESTION_FILE, QUESTION_STORE, RENDERERS, RENDER_VERSION)
+
+question_scheduler = QuestionScheduler(SCHEDULE_STATE)
 
 def pick_random_question(questions):
-    return random.choice(questions)
+    # 按持久化的随机排列依次出题，一轮内不重复，返回下标
+    return question_scheduler.next_index(len(questions))
 
 def format_sat():
     try:
         questions = load_questions()
-        q = pick_random_question(questions)
-        question = q["question"]["question"]
-        choices = q["question"]["choices"]
-        correct = q["question"]["correct_answer"]
-        explanation = q["question"]["explanation"]
-        domain = q.get("domain","无数据")
-        difficulty = q.get("difficulty","无数据")
-        
+        i = pick_random_question(questions)
         if USE_LATEX_TEXT:
-            question = latex_to_text(question)
-            choices = {k: latex_to_text(v) for k, v in choices.items()}
-            explanation = latex_to_text(explanation)
-        else:
-            question = question
-            choices = choices
-            explanation = explanation 
-        
-        text = "="*27 + "\n"
-        text += f"📘 SAT 每日一题 | 更新时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-        text += "-"*30 + "\n"
-        text += f"📚 分类: {domain}\n💡 难度: {difficulty}\n"
-        text += "-"*30 + "\n\n"
-        text += f"题目:\n{question}\n"
-        for k,v in choices.items():
-            text += f"  {k}. {v}\n"
-        text += "-"*30 + "\n\n"
-        text += f"✅ 正确答案: {correct}\n"
-        text += f"🧩 解析: {explanation}\n"
-        text += ""
-        return text
+            return digest_section(questions, i)
+        return digest_header() + render_digest(questions[i], latex=False)
     except:
         return "📘 SAT 每日一题: 无数据\n"
 
-# ===================== 推送函数 =====================
-def send_telegram(msg):
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-    requests.get(url, params={"chat_id": TELEGRAM_CHAT_ID, "text": msg})
-
-def send_wechat(msg):
-    token_url = f"https://qyapi.weixin.qq.com/cgi-bin/gettoken?corpid={WX_CORP_ID}&corpsecret={WX_SECRET}"
-    r = requests.get(token_url).json()
-    access_token = r.get("access_token")
-    if not access_token:
-        print("企业微信获取access_token失败")
-        return
-    send_url = f"https://qyapi.weixin.qq.com/cgi-bin/message/send?access_token={access_token}"
-    data = {
-        "touser": "@all",
-        "msgtype": "text",
-        "agentid": int(WX_AGENT_ID),
-        "text": {"content": msg},
-        "safe": 0
-    }
-    requests.post(send_url, json=data)
+# ===================== 并发抓取 =====================
+# 各板块截止时间（秒，从开始抓取算起），超时只影响对应板块
+WEATHER_DEADLINE = 12
+QUOTE_DEADLINE = 15
+SAT_DEADLINE = 10
+
+def wait_result(future, start, deadline):
+    return future.result(timeout=max(0, deadline - (time.monotonic() - start)))
+
+def build_digest():
+    start = time.monotonic()
+    pool = ThreadPoolExecutor(max_workers=4)
+    weather_future = pool.submit(get_weather_batch)
+    # 翻译只依赖每日一句，在同一个任务里串行
+    quote_future = pool.submit(format_quote)
+    sat_future = pool.submit(format_sat)
+    # 不等待超时的任务，结果直接丢弃
+    pool.shutdown(wait=False)
 
-# ===================== 主程序 =====================
-if __name__ == "__main__":
     push_msg = ""
-    
-    # 日历信息
-    #push_msg += get_lunar_info() + "\n"
-    
+
     # 天气信息
     try:
-        weather_info = get_weather()
-        air_info = get_air_quality()
-        push_msg += f"======== {CITY_NAME} =======\n"
-        push_msg += get_lunar_info() + "\n"
-        push_msg += format_weather(weather_info, air_info)
+        lunar_info = get_lunar_info()
+        weather_results = wait_result(weather_future, start, WEATHER_DEADLINE)
+        push_msg += format_weather_section(lunar_info, weather_results)
+    except FuturesTimeout:
+        push_msg += "❌ 获取天气失败: 超时\n"
     except Exception as e:
         push_msg += f"❌ 获取天气失败: {e}\n"
-    
+
     # 每日一句
-    push_msg += format_quote()
-    
+    try:
+        push_msg += wait_result(quote_future, start, QUOTE_DEADLINE)
+    except FuturesTimeout:
+        push_msg += "🌞 每日一句: 超时\n\n"
+
     # SAT题
-    push_msg += format_sat()
+    try:
+        push_msg += wait_result(sat_future, start, SAT_DEADLINE)
+    except FuturesTimeout:
+        push_msg += "📘 SAT 每日一题: 超时\n"
+
+    return push_msg
+
+# ===================== 主程序 =====================
+def main():
+    push_msg = build_digest()
     
     # 控制台打印
     print(push_msg)
     
-    # 推送
-    try:
-        send_telegram(push_msg)
-        send_wechat(push_msg)
-    except Exception as e:
-        print(f"❌ 推送失败: {e}")
+    # 推送：各渠道并发发送，互不影响
+    push(push_msg)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""网页抓取缓存：按 URL 缓存页面的解析结果，配合条件请求使用
+
+  - 新鲜期内（响应的 Cache-Control max-age，不低于 min_fresh）直接返回解析结果，不发请求
+  - 过期后带 If-None-Match / If-Modified-Since 请求，304 时沿用旧的解析结果，不下载也不重新解析
+  - 只缓存解析后的结果（需可 JSON 序列化），不保存原始 HTML；可落盘供多个进程共用
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import http_client
+from json_file import JsonFile
+
+MIN_FRESH = 60
+MAX_ENTRIES = 50
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class PageCache(object):
+    """URL -> {data, etag, last_modified, fetched_at, fresh_until}，超出 max_entries 时淘汰最久未用的"""
+
+    def __init__(self, path=None, max_entries=MAX_ENTRIES, min_fresh=MIN_FRESH):
+        self.path = path
+        self.max_entries = max_entries
+        self.min_fresh = min_fresh
+        self._entries = OrderedDict()
+        self._file = JsonFile(path) if path else None
+        self._lock = threading.Lock()
+
+    def fetch(self, url, parse, min_fresh=None, timeout=10):
+        """返回 parse(html) 的结果
+        @param parse: 接收页面文本，返回可 JSON 序列化的解析结果
+        @param min_fresh: 本 URL 的最短新鲜期（秒），默认用 self.min_fresh
+        """
+        min_fresh = self.min_fresh if min_fresh is None else min_fresh
+        entry = self._entry(url)
+        if entry is not None and time.time() < entry["fresh_until"]:
+            return entry["data"]
+
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        res = http_client.get(url, headers=headers, timeout=timeout)
+        if res.status_code == 304 and entry is not None:
+            data = entry["data"]
+        else:
+            res.raise_for_status()
+            data = parse(res.text)
+        self._store(url, data, res, min_fresh)
+        return data
+
+    def invalidate(self, url):
+        with self._lock:
+            self._entries.pop(url, None)
+
+    def _entry(self, url):
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None or time.time() >= entry["fresh_until"]:
+                # 本进程没有可用的条目时才看文件：BBC 推送可能由另一个进程刚抓过
+                self._load_file()
+                entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+            return entry
+
+    def _store(self, url, data, res, min_fresh):
+        now = time.time()
+        match = _MAX_AGE.search(res.headers.get("Cache-Control", ""))
+        max_age = int(match.group(1)) if match else 0
+        entry = {
+            "data": data,
+            # 304 响应可能不带校验头，沿用上次的
+            "etag": res.headers.get("ETag"),
+            "last_modified": res.headers.get("Last-Modified"),
+            "fetched_at": now,
+            "fresh_until": now + max(max_age, min_fresh),
+        }
+        with self._lock:
+            old = self._entries.pop(url, None)
+            if res.status_code == 304 and old is not None:
+                entry["etag"] = entry["etag"] or old.get("etag")
+                entry["last_modified"] = entry["last_modified"] or old.get("last_modified")
+            self._entries[url] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._save_file()
+
+    def _load_file(self):
+        if self._file is not None:
+            self._merge(self._file.load())
+
+    def _merge(self, entries):
+        """并入文件中的条目，同一 URL 保留 fetched_at 较新的，超出上限时淘汰最久未用的；返回全部条目"""
+        for url, entry in (entries or {}).items():
+            current = self._entries.get(url)
+            if current is None or entry.get("fetched_at", 0) > current["fetched_at"]:
+                self._entries[url] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return self._entries
+
+    def _save_file(self):
+        if self._file is None:
+            return
+        try:
+            # 文件锁内合并后写回，两个进程同时抓取不同页面时都能保留
+            self._file.update(self._merge)
+        except OSError as e:
+            print(f"写入网页缓存失败: {e}")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""题目预渲染：把题目转成可直接推送的文本，写入题库索引文件
+
+除时间戳那一行外，推送的题目文本只取决于题目本身。构建索引时按下面的
+RENDERERS 把每道题渲染好（LaTeX 文本化、拼好版式、按渠道长度截断）存进
+questions.qbin，出题时只需取出对应的渲染结果再拼上时间戳。
+重新构建时内容没变的题目直接复用上次的渲染结果。
+
+用法: python3 question_render.py [questions.json] [questions.qbin]
+"""
+import sys
+from datetime import datetime
+
+from latex_text import latex_to_text
+from question_store import QUESTION_FILE, QUESTION_STORE, QuestionStore, build_store
+
+# 版式或渲染逻辑改动时递增，已有的渲染结果会全部重做
+RENDER_VERSION = "2"
+
+# 渠道消息长度上限：Telegram 按字符，企业微信文本消息按 UTF-8 字节
+TELEGRAM_LIMIT = 4096
+WECHAT_LIMIT = 2048
+# 给时间戳那一行预留的长度
+HEADER_RESERVE = 80
+TRUNCATED = "…"
+
+
+def question_fields(q, latex=True):
+    """取出题目各部分，latex 为真时做文本化"""
+    body = q["question"]
+    question = body["question"]
+    choices = body["choices"]
+    explanation = body["explanation"]
+    if latex:
+        question = latex_to_text(question)
+        choices = {k: latex_to_text(v) for k, v in choices.items()}
+        explanation = latex_to_text(explanation)
+    return question, choices, body["correct_answer"], explanation
+
+
+def _cut(text, room, size):
+    """截取不超过 room 的前缀"""
+    if size is len:
+        return text[:room]
+    return text.encode("utf-8")[:room].decode("utf-8", "ignore")
+
+
+def _fit(parts, explanation, limit, size):
+    """超出渠道上限时先截断解析，题目和选项本身就超长时整体截断"""
+    text = "".join(parts) + f"🧩 解析: {explanation}\n"
+    if limit is None or size(text) <= limit:
+        return text
+    tail = TRUNCATED + "\n"
+    head = "".join(parts) + "🧩 解析: "
+    room = limit - size(head) - size(tail)
+    if room <= 0:
+        return _cut(text, limit - size(tail), size) + tail
+    return head + _cut(explanation, room, size) + tail
+
+
+def _utf8_size(text):
+    return len(text.encode("utf-8"))
+
+
+# ===================== sat.py 版式 =====================
+def sat_header(now=None):
+    now = now or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return f"📘 SAT 每日一题  |  更新时间: {now}\n"
+
+
+def render_sat(q, latex=True, limit=None, size=len):
+    """sat.py 推送的正文（不含时间戳那一行）"""
+    question, choices, correct, explanation = question_fields(q, latex)
+    parts = [
+        "=" * 27 + "\n",
+        f"📚 分类: {q.get('domain', '未知分类')}   \n💡 难度: {q.get('difficulty', '未知难度')}\n",
+        "-" * 52 + "\n",
+        f"📝 题目：\n{question}\n",
+    ]
+    parts.extend(f"  {key}. {choices.get(key, '')}\n" for key in ["A", "B", "C", "D"])
+    parts.append("-" * 52 + "\n")
+    parts.append(f"✅ 正确答案: {correct}\n")
+    return _fit(parts, explanation, limit, size)
+
+
+def render_sat_telegram(q):
+    return render_sat(q, limit=TELEGRAM_LIMIT - HEADER_RESERVE)
+
+
+def render_sat_wechat(q):
+    return render_sat(q, limit=WECHAT_LIMIT - HEADER_RESERVE, size=_utf8_size)
+
+
+# ===================== main.py 每日推送版式 =====================
+def digest_header(now=None):
+    now = now or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return "=" * 27 + "\n" + f"📘 SAT 每日一题 | 更新时间: {now}\n"
+
+
+def render_digest(q, latex=True):
+    """每日推送里 SAT 板块的正文（不含时间戳那一行）"""
+    question, choices, correct, explanation = question_fields(q, latex)
+    parts = [
+        "-" * 30 + "\n",
+        f"📚 分类: {q.get('domain', '无数据')}\n💡 难度: {q.get('difficulty', '无数据')}\n",
+        "-" * 30 + "\n\n",
+        f"题目:\n{question}\n",
+    ]
+    parts.extend(f"  {k}. {v}\n" for k, v in choices.items())
+    parts.append("-" * 30 + "\n\n")
+    parts.append(f"✅ 正确答案: {correct}\n")
+    return _fit(parts, explanation, None, len)
+
+
+# 预渲染的版本：名称 -> 渲染函数
+RENDERERS = {
+    "sat.telegram": render_sat_telegram,
+    "sat.wechat": render_sat_wechat,
+    "digest": render_digest,
+}
+
+
+def sat_message(store, i, now=None):
+    """sat.py 推送的消息，按渠道区分：{"telegram": ..., "wechat": ..., "default": ...}"""
+    header = sat_header(now)
+    if store.has_rendered("sat.telegram", RENDER_VERSION):
+        telegram = header + store.rendered(i, "sat.telegram")
+        wechat = header + store.rendered(i, "sat.wechat")
+    else:
+        q = store[i]
+        telegram = header + render_sat_telegram(q)
+        wechat = header + render_sat_wechat(q)
+    return {"telegram": telegram, "wechat": wechat, "default": telegram}
+
+
+def digest_section(store, i, now=None):
+    """每日推送里的 SAT 板块"""
+    if store.has_rendered("digest", RENDER_VERSION):
+        body = store.rendered(i, "digest")
+    else:
+        body = render_digest(store[i])
+    return digest_header(now) + body
+
+
+def build(json_path=QUESTION_FILE, store_path=QUESTION_STORE):
+    """构建带预渲染结果的索引文件"""
+    return build_store(json_path, store_path, RENDERERS, RENDER_VERSION)
+
+
+if __name__ == "__main__":
+    src = sys.argv[1] if len(sys.argv) > 1 else QUESTION_FILE
+    dst = sys.argv[2] if len(sys.argv) > 2 else QUESTION_STORE
+    n = build(src, dst)
+    store = QuestionStore(dst)
+    stats = store.meta["rendered"]["stats"]
+    print(f"已生成 {dst}，共 {n} 题，重新渲染 {stats['rendered']} 题，复用 {stats['reused']} 题")
+    store.close()
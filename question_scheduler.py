@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""不重复出题：按一个随机排列依次走完整个题库，一轮内每题只出一次
+
+排列由 seed 通过 Feistel 网络确定，不需要保存排列本身或已出过的题目，
+持久化状态只有 seed、当前位置、题库大小和轮次；取下一题是 O(1)，重启后接着走。
+"""
+import hashlib
+import json
+import os
+import secrets
+import threading
+
+try:
+    import fcntl
+except ImportError:  # 非 POSIX 平台不做跨进程互斥
+    fcntl = None
+
+SCHEDULE_STATE = "/home/learning/question_state.json"
+FEISTEL_ROUNDS = 4
+
+
+def permute(i, n, seed):
+    """把 [0, n) 中的 i 映射到同一区间内，seed 固定时为一一映射"""
+    bits = max(2, (n - 1).bit_length())
+    bits += bits % 2
+    half = bits // 2
+    mask = (1 << half) - 1
+    x = i
+    while True:
+        left, right = x >> half, x & mask
+        for r in range(FEISTEL_ROUNDS):
+            digest = hashlib.blake2b(f"{seed}:{r}:{right}".encode(), digest_size=8).digest()
+            left, right = right, left ^ (int.from_bytes(digest, "big") & mask)
+        x = (left << half) | right
+        # cycle walking：落在 [n, 2^bits) 时继续映射，直到回到 [0, n)
+        if x < n:
+            return x
+
+
+class QuestionScheduler(object):
+    """持久化的出题顺序"""
+
+    def __init__(self, path=SCHEDULE_STATE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def next_index(self, n):
+        """返回下一题的下标；题库大小变化或走完一轮时换新 seed 开始新一轮"""
+        if n <= 0:
+            raise ValueError("题库为空")
+        with self._lock, self._file_lock():
+            state = self._load()
+            if state.get("size") != n or state.get("position", 0) >= n:
+                state = {"seed": secrets.randbits(64), "position": 0, "size": n,
+                         "cycle": state.get("cycle", 0) + 1}
+            index = permute(state["position"], n, state["seed"])
+            state["position"] += 1
+            self._save(state)
+            return index
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            return state if isinstance(state, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, state):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.path)
+
+    def _file_lock(self):
+        return _FileLock(f"{self.path}.lock")
+
+
+class _FileLock(object):
+    """跨进程互斥，保证多个脚本同时出题时不会拿到同一个位置"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            try:
+                self._file = open(self.path, "a")
+                fcntl.flock(self._file, fcntl.LOCK_EX)
+            except OSError:
+                self._file = None
+        return self
+
+    def __exit__(self, *exc):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
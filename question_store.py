@@ -0,0 +1,572 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""题库索引文件：把 questions.json 转成 偏移表 + 记录 的二进制文件
+
+抽题时 mmap 打开，只解码选中的那一条记录，耗时与题库大小无关。
+构建时流式解析 JSON，一次只在内存中保留一道题，几百 MB 的题库也不会撑爆小内存机器。
+构建时按 (分类, domain, difficulty) 分组生成倒排表，按条件抽题不需要扫描题库。
+
+文件结构（小端）:
+  头部      magic(4s) version(H) reserved(H) count(I) meta_offset(Q) meta_length(Q)
+  偏移表    (count + 1) 个 uint64，第 i 条记录位于 [offsets[i], offsets[i+1])
+  分类表    count 个 uint16，对应 meta["categories"] 的下标
+  记录      每条题目的 UTF-8 JSON
+  倒排表    uint32 题目下标，按分组连续存放
+  摘要表    count 个 8 字节 blake2b，对应每条记录的内容，重新构建时据此复用预渲染结果
+  预渲染    每个版本一张 (count + 1) 个 uint64 的偏移表，之后是各题渲染好的 UTF-8 文本
+  元数据    JSON：分类名、分组 [分类, domain, difficulty, 倒排起点, 题数]、源文件信息、预渲染版本
+
+用法: python3 question_render.py [questions.json] [questions.qbin]
+  （python3 question_store.py 参数相同，也通过 question_render 构建，生成的索引带预渲染结果；
+   没有预渲染结果的索引会被 main.py / sat.py 当作过期而重建）
+"""
+import contextlib
+import hashlib
+import json
+import logging
+import mmap
+import os
+import random
+import re
+import struct
+import sys
+import threading
+import time
+
+QUESTION_FILE = "/home/learning/questions.json"
+QUESTION_STORE = "/home/learning/questions.qbin"
+
+MAGIC = b"QBNK"
+VERSION = 3
+HEADER = struct.Struct("<4sHHIQQ")
+OFFSET = struct.Struct("<Q")
+CATEGORY = struct.Struct("<H")
+POSTING = struct.Struct("<I")
+DIGEST_SIZE = 8
+# 流式解析每次读取的字符数
+STREAM_CHUNK = 1 << 16
+# 常驻进程检查 JSON 是否变化的间隔（秒）
+CHECK_INTERVAL = 5
+
+
+class StoreFormatError(Exception):
+    pass
+
+
+# ===================== 流式解析 =====================
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class _StreamReader(object):
+    """分块读取文本，只在缓冲区里保留尚未解析的部分"""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """丢弃已解析的部分并读入更多数据；读取量至少与缓冲区相当，单个超大元素也只需线性时间"""
+        data = self.f.read(max(self.chunk_size, len(self.buf) - self.pos))
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        if not data:
+            self.eof = True
+        return bool(data)
+
+    def peek(self):
+        """跳过空白，返回下一个字符，结束时返回空串"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, chars):
+        c = self.peek()
+        if not c or c not in chars:
+            raise ValueError(f"题库 JSON 格式错误：需要 {chars!r}，实际为 {c!r}")
+        self.pos += 1
+        return c
+
+    def value(self):
+        """解析下一个完整的 JSON 值；数据不够时继续读取"""
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+                # 恰好解析到缓冲区末尾时可能被截断（如数字），多读一些再确认
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill()
+
+
+def iter_questions(json_path, chunk_size=STREAM_CHUNK):
+    """流式产出 (分类, 题目)，内存占用只与单道题的大小有关，与题库大小无关
+    题库格式为 {"分类": [题目, ...], ...}
+    """
+    with open(json_path, "r", encoding="utf-8") as f:
+        reader = _StreamReader(f, chunk_size)
+        reader.expect("{")
+        if reader.peek() == "}":
+            return
+        while True:
+            category = reader.value()
+            reader.expect(":")
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.pos += 1
+            else:
+                while True:
+                    yield category, reader.value()
+                    if reader.expect(",]") == "]":
+                        break
+            if reader.expect(",}") == "}":
+                return
+
+
+def reservoir_sample(items, k=1, rng=random):
+    """蓄水池抽样：一遍扫描从长度未知的序列中等概率抽取 k 个"""
+    sample = []
+    for n, item in enumerate(items):
+        if n < k:
+            sample.append(item)
+        else:
+            j = rng.randrange(n + 1)
+            if j < k:
+                sample[j] = item
+    return sample
+
+
+def random_question(json_path=QUESTION_FILE, rng=random):
+    """不建索引，流式扫描一遍 JSON 随机抽一题，返回 (分类, 题目)；题库为空时返回 None"""
+    sample = reservoir_sample(iter_questions(json_path), 1, rng)
+    return sample[0] if sample else None
+
+
+# ===================== 构建 =====================
+def file_digest(path):
+    """题库文件内容的摘要，mtime 变了但内容没变时据此避免重建"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(1 << 20)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def record_digest(blob):
+    return hashlib.blake2b(blob, digest_size=DIGEST_SIZE).digest()
+
+
+def _previous_renders(store_path, names, render_version):
+    """上一次构建的索引文件：含同版本的全部渲染结果时返回 (QuestionStore, {摘要: 下标})，否则 (None, {})"""
+    try:
+        old = QuestionStore(store_path)
+    except (OSError, ValueError, struct.error, StoreFormatError):
+        return None, {}
+    if not all(old.has_rendered(name, render_version) for name in names):
+        old.close()
+        return None, {}
+    return old, {old.digest(i): i for i in range(len(old))}
+
+
+def build_store(json_path=QUESTION_FILE, store_path=QUESTION_STORE, renderers=None, render_version=None):
+    """把 JSON 题库转换成索引文件；先写临时文件再替换，读者不会看到写了一半的文件
+    @param renderers: {名称: 渲染函数(题目) -> str}，构建时预渲染每道题；
+                      render_version 与上次相同时，内容没变的题目复用上次的渲染结果
+    """
+    st = os.stat(json_path)
+    renderers = renderers or {}
+    names = list(renderers)
+    old, old_index = _previous_renders(store_path, names, render_version) if names else (None, {})
+    categories = []
+    category_ids = {}
+    offsets = []
+    cats = []
+    digests = []
+    groups = {}
+    # 每个渲染版本的文本连续存放，记录在本版本渲染区内的相对偏移
+    render_offsets = [[] for _ in names]
+    render_sizes = [0] * len(names)
+    stats = {"rendered": 0, "reused": 0}
+    tmp = f"{store_path}.{os.getpid()}.tmp"
+    # 偏移表和分类表要等记录写完才知道，先写记录和渲染结果到临时区域
+    scratch = [tmp + ".records"] + [f"{tmp}.rendered{k}" for k in range(len(names))]
+    with contextlib.ExitStack() as stack:
+        # 退出时（含出错）清理临时文件，最后关闭旧索引
+        if old is not None:
+            stack.callback(old.close)
+        stack.callback(_remove_quietly, [tmp] + scratch)
+        out = stack.enter_context(open(tmp, "wb"))
+        records, *rendered = [stack.enter_context(open(path, "w+b")) for path in scratch]
+        pos = 0
+        for category, q in iter_questions(json_path):
+            if category not in category_ids:
+                category_ids[category] = len(categories)
+                categories.append(category)
+            blob = json.dumps(q, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            digest = record_digest(blob)
+            offsets.append(pos)
+            cats.append(category_ids[category])
+            digests.append(digest)
+            key = (category, q.get("domain"), q.get("difficulty"))
+            groups.setdefault(key, []).append(len(cats) - 1)
+            records.write(blob)
+            pos += len(blob)
+            if names:
+                j = old_index.get(digest)
+                for k, name in enumerate(names):
+                    text = renderers[name](q).encode("utf-8") if j is None else old.rendered_bytes(j, name)
+                    render_offsets[k].append(render_sizes[k])
+                    rendered[k].write(text)
+                    render_sizes[k] += len(text)
+                stats["rendered" if j is None else "reused"] += 1
+        offsets.append(pos)
+        for table, size in zip(render_offsets, render_sizes):
+            table.append(size)
+
+        count = len(cats)
+        records_start = HEADER.size + OFFSET.size * (count + 1) + CATEGORY.size * count
+        postings_offset = records_start + pos
+        digests_offset = postings_offset + POSTING.size * count
+        tables_offset = digests_offset + DIGEST_SIZE * count
+        rendered_starts = []
+        start = tables_offset + OFFSET.size * (count + 1) * len(names)
+        for size in render_sizes:
+            rendered_starts.append(start)
+            start += size
+        meta_offset = start
+        group_table = []
+        start = 0
+        for (category, domain, difficulty), ids in groups.items():
+            group_table.append([category, domain, difficulty, start, len(ids)])
+            start += len(ids)
+        meta = {
+            "categories": categories,
+            "groups": group_table,
+            "postings_offset": postings_offset,
+            "digests_offset": digests_offset,
+            "source": {"path": os.path.abspath(json_path), "size": st.st_size, "mtime": st.st_mtime,
+                       "mtime_ns": st.st_mtime_ns, "digest": file_digest(json_path)},
+        }
+        if names:
+            meta["rendered"] = {
+                "version": render_version,
+                "variants": {name: tables_offset + OFFSET.size * (count + 1) * k for k, name in enumerate(names)},
+                "stats": stats,
+            }
+        meta = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+
+        out.write(HEADER.pack(MAGIC, VERSION, 0, count, meta_offset, len(meta)))
+        out.write(struct.pack(f"<{count + 1}Q", *(records_start + o for o in offsets)))
+        out.write(struct.pack(f"<{count}H", *cats))
+        _copy(records, out)
+        for ids in groups.values():
+            out.write(struct.pack(f"<{len(ids)}I", *ids))
+        out.write(b"".join(digests))
+        for table, base in zip(render_offsets, rendered_starts):
+            out.write(struct.pack(f"<{count + 1}Q", *(base + o for o in table)))
+        for f in rendered:
+            _copy(f, out)
+        out.write(meta)
+        out.close()
+        os.replace(tmp, store_path)
+    return count
+
+
+def _remove_quietly(paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _copy(src, dst):
+    src.seek(0)
+    while True:
+        chunk = src.read(1 << 20)
+        if not chunk:
+            break
+        dst.write(chunk)
+
+
+# ===================== 读取 =====================
+class QuestionStore(object):
+    """只读题库，按下标取题；支持 len() 和下标访问，可直接交给 random.choice"""
+
+    def __init__(self, path=QUESTION_STORE):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count, meta_offset, meta_length = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise StoreFormatError(f"{path} 不是题库索引文件或版本不匹配")
+        self.count = count
+        self._offsets_at = HEADER.size
+        self._cats_at = self._offsets_at + OFFSET.size * (count + 1)
+        self.meta = json.loads(self._mm[meta_offset:meta_offset + meta_length].decode("utf-8"))
+        self.categories = self.meta["categories"]
+        self.groups = [tuple(g) for g in self.meta["groups"]]
+        self._postings_at = self.meta["postings_offset"]
+        self._digests_at = self.meta["digests_offset"]
+        rendered = self.meta.get("rendered") or {}
+        self.render_version = rendered.get("version")
+        self._rendered_at = rendered.get("variants", {})
+        self._select_cache = {}
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        return json.loads(self.record(i))
+
+    def record(self, i):
+        """第 i 条记录的原始 JSON 字节"""
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        start, end = struct.unpack_from("<QQ", self._mm, self._offsets_at + OFFSET.size * i)
+        return self._mm[start:end]
+
+    def digest(self, i):
+        """第 i 条记录内容的摘要"""
+        at = self._digests_at + DIGEST_SIZE * i
+        return self._mm[at:at + DIGEST_SIZE]
+
+    def has_rendered(self, name, version=None):
+        """是否有名为 name（且版本一致）的预渲染结果"""
+        return name in self._rendered_at and (version is None or version == self.render_version)
+
+    def rendered_bytes(self, i, name):
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        start, end = struct.unpack_from("<QQ", self._mm, self._rendered_at[name] + OFFSET.size * i)
+        return self._mm[start:end]
+
+    def rendered(self, i, name):
+        """第 i 题预渲染好的文本"""
+        return self.rendered_bytes(i, name).decode("utf-8")
+
+    def category(self, i):
+        return self.categories[CATEGORY.unpack_from(self._mm, self._cats_at + CATEGORY.size * i)[0]]
+
+    def random(self):
+        return self[random.randrange(self.count)]
+
+    # ---------- 按条件抽题 ----------
+    def select(self, category=None, domain=None, difficulty=None):
+        """返回匹配的分组列表 [(分类, domain, difficulty, 倒排起点, 题数)]
+        分类、难度精确匹配，domain 为子串匹配，均不区分大小写；结果按条件缓存
+        """
+        key = tuple(v.lower() if v else None for v in (category, domain, difficulty))
+        groups = self._select_cache.get(key)
+        if groups is None:
+            category, domain, difficulty = key
+            groups = [g for g in self.groups
+                      if (category is None or g[0].lower() == category)
+                      and (domain is None or domain in (g[1] or "").lower())
+                      and (difficulty is None or (g[2] or "").lower() == difficulty)]
+            self._select_cache[key] = groups
+        return groups
+
+    def sample(self, category=None, domain=None, difficulty=None, weights=None):
+        """按条件随机返回一个题目下标，没有匹配时返回 None
+        @param weights: {分类: 权重}，先按权重选分类再在分类内均匀抽取；不传则所有匹配题目等概率
+        """
+        groups = self.select(category, domain, difficulty)
+        if weights:
+            by_category = {}
+            for g in groups:
+                if weights.get(g[0], 0) > 0:
+                    by_category.setdefault(g[0], []).append(g)
+            if not by_category:
+                return None
+            names = list(by_category)
+            chosen = random.choices(names, weights=[weights[n] for n in names])[0]
+            groups = by_category[chosen]
+        total = sum(g[4] for g in groups)
+        if not total:
+            return None
+        k = random.randrange(total)
+        for g in groups:
+            if k < g[4]:
+                return POSTING.unpack_from(self._mm, self._postings_at + POSTING.size * (g[3] + k))[0]
+            k -= g[4]
+
+    def pick(self, category=None, domain=None, difficulty=None, weights=None):
+        i = self.sample(category, domain, difficulty, weights)
+        return None if i is None else self[i]
+
+    def parse_query(self, text):
+        """把 "hard algebra" 这样的文字解析成筛选条件
+        与难度或分类同名的词作为难度/分类，其余词拼起来匹配 domain
+        """
+        difficulties = {(g[2] or "").lower() for g in self.groups}
+        categories = {c.lower() for c in self.categories}
+        filters = {}
+        rest = []
+        for word in text.lower().split():
+            if word in difficulties:
+                filters["difficulty"] = word
+            elif word in categories:
+                filters["category"] = word
+            else:
+                rest.append(word)
+        if rest:
+            filters["domain"] = " ".join(rest)
+        return filters
+
+    def close(self):
+        self._mm.close()
+
+
+# ===================== 加载与热更新 =====================
+class StoreLoader(object):
+    """题库的进程内缓存，按 JSON 的 大小 / mtime / 内容摘要 判断是否需要重建
+
+    首次 get() 同步加载；之后每隔 check_interval 秒 stat 一次 JSON，
+    发现变化时在后台线程重建索引，完成后原子替换 self._store。
+    重建期间的请求继续使用旧实例，不会被阻塞；旧实例的 mmap 随最后一个引用释放。
+    """
+
+    def __init__(self, json_path=QUESTION_FILE, store_path=QUESTION_STORE, renderers=None,
+                 render_version=None, check_interval=CHECK_INTERVAL):
+        self.json_path = json_path
+        self.store_path = store_path
+        self.renderers = renderers
+        self.render_version = render_version
+        self.check_interval = check_interval
+        self._store = None
+        self._stamp = None  # 最近一次确认与索引一致的 JSON (大小, mtime_ns)
+        self._checked = 0.0
+        self._lock = threading.Lock()  # 串行化加载和重建
+        self._watcher = None
+
+    def get(self):
+        store = self._store
+        if store is None:
+            with self._lock:
+                if self._store is None:
+                    self._store = self._load()
+                    self._checked = time.monotonic()
+                return self._store
+        if time.monotonic() - self._checked >= self.check_interval:
+            self._checked = time.monotonic()
+            if not self._lock.locked() and self._json_stamp() != self._stamp:
+                threading.Thread(target=self.refresh, name="question-reload", daemon=True).start()
+        return store
+
+    def refresh(self):
+        """检查 JSON 并在需要时重建、替换，返回是否换成了新实例；出错时保留旧实例"""
+        with self._lock:
+            current = self._store
+            try:
+                store = self._load(current)
+            except Exception:
+                logging.exception(f"重新加载题库 {self.json_path} 失败，继续使用旧题库")
+                return False
+            self._store = store
+            if store is not current:
+                logging.info(f"题库已更新: {len(store)} 题")
+            return store is not current
+
+    def watch(self, interval=None):
+        """启动后台线程定期 refresh，常驻进程（learning.py）使用"""
+        if self._watcher is None:
+            interval = interval or self.check_interval
+            self._watcher = threading.Thread(target=self._watch, args=(interval,),
+                                             name="question-watch", daemon=True)
+            self._watcher.start()
+        return self._watcher
+
+    def _watch(self, interval):
+        while True:
+            time.sleep(interval)
+            if self._json_stamp() != self._stamp:
+                self.refresh()
+
+    def _json_stamp(self):
+        try:
+            st = os.stat(self.json_path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def _load(self, current=None):
+        """返回与 JSON 内容一致的 QuestionStore：依次尝试当前实例、磁盘上的索引文件（可能已被
+        其他进程重建），都不一致时重新构建"""
+        stamp = self._json_stamp()
+        digest = []  # 只在大小相同、mtime 不同时才计算，且最多一次
+
+        def matches(store):
+            if store is None or not all(store.has_rendered(n, self.render_version) for n in self.renderers or ()):
+                return False
+            source = store.meta["source"]
+            if (source.get("size"), source.get("mtime_ns")) == stamp:
+                return True
+            if source.get("size") != stamp[0] or not source.get("digest"):
+                return False
+            if not digest:
+                digest.append(file_digest(self.json_path))
+            return source["digest"] == digest[0]
+
+        if stamp is None:
+            raise FileNotFoundError(self.json_path)
+        if matches(current):
+            store = current
+        else:
+            store = _try_open(self.store_path)
+            if not matches(store):
+                build_store(self.json_path, self.store_path, self.renderers, self.render_version)
+                store = QuestionStore(self.store_path)
+        self._stamp = stamp
+        return store
+
+
+def _try_open(store_path):
+    try:
+        return QuestionStore(store_path)
+    except (OSError, ValueError, struct.error, StoreFormatError):
+        return None
+
+
+_loaders = {}
+_loaders_lock = threading.Lock()
+
+
+def get_loader(json_path=QUESTION_FILE, store_path=QUESTION_STORE, renderers=None, render_version=None):
+    """同一索引文件在进程内共用一个 StoreLoader"""
+    with _loaders_lock:
+        loader = _loaders.get(store_path)
+        if loader is None:
+            loader = _loaders[store_path] = StoreLoader(json_path, store_path, renderers, render_version)
+        return loader
+
+
+def open_store(json_path=QUESTION_FILE, store_path=QUESTION_STORE, renderers=None, render_version=None):
+    """打开索引文件；不存在、与 JSON 不一致或缺少所需的预渲染结果时先重新构建。
+    同一进程内复用已打开的实例，JSON 变化后自动在后台换成新题库
+    """
+    return get_loader(json_path, store_path, renderers, render_version).get()
+
+
+if __name__ == "__main__":
+    src = sys.argv[1] if len(sys.argv) > 1 else QUESTION_FILE
+    dst = sys.argv[2] if len(sys.argv) > 2 else QUESTION_STORE
+    # 预渲染由 question_render 负责（它依赖本模块，只能在这里导入）
+    from question_render import build
+    n = build(src, dst)
+    print(f"已生成 {dst}，共 {n} 题")
@@ -1,37 +1,268 @@
-import requests
-from datetime import datetime
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""每日一句：预取 zenquotes 的名言和译文存入本地语料库，推送时直接读取
+
+  - prefetch() 每天请求一次 today 接口（可选批量 quotes 接口），连同译文写入语料库
+  - daily_quote() 优先取当天已预取的名言；没有名言或还没有译文时现取一次，再失败就从语料库里
+    挑一句已翻译的旧名言，而不是返回"无数据"
+  - learning.py 常驻时用 start_prefetcher() 在后台定期预取；也可以用 cron 运行
+    python3 quotes.py --prefetch
+
+语料库文件: {"quotes": {key: {"q": 英文, "a": 作者, "zh": 译文}}, "days": {日期: key}, "bulk_day": 日期}
+"""
+import hashlib
+import os
+import threading
+import time
+from datetime import date, datetime
+
+import http_client
+from json_file import JsonFile
+from translation import translate
+
+ZENQUOTES_TODAY = "https://zenquotes.io/api/today"
+ZENQUOTES_BULK = "https://zenquotes.io/api/quotes"
+QUOTE_CORPUS_FILE = "/home/learning/quotes_corpus.json"
+# zenquotes 请求不重试，超时有上限
+FETCH_TIMEOUT = (3, 5)
+# 每次预取最多为语料库里的旧名言补几条译文，避免耗尽 MyMemory 每日额度
+BULK_TRANSLATE = 5
+MAX_QUOTES = 5000
+PREFETCH_INTERVAL = 3600
+
+
+def quote_key(quote):
+    return hashlib.sha1(quote.strip().encode("utf-8")).hexdigest()[:16]
+
+
+class QuoteCorpus(object):
+    """按日期和名言 key 索引的本地语料库，落盘供多个进程共用"""
+
+    def __init__(self, path=QUOTE_CORPUS_FILE, max_quotes=MAX_QUOTES):
+        self.path = path
+        self.max_quotes = max_quotes
+        self.data = {"quotes": {}, "days": {}, "bulk_day": None}
+        self._file = JsonFile(path) if path else None
+        self._lock = threading.Lock()
+
+    def for_day(self, day):
+        with self._lock:
+            self._load_file()
+            key = self.data["days"].get(day)
+            return self._entry(key)
+
+    def fallback(self, day):
+        """挑一句旧名言：优先已翻译的，同一天总是同一句"""
+        with self._lock:
+            self._load_file()
+            keys = [k for k, q in self.data["quotes"].items() if q.get("zh")] or list(self.data["quotes"])
+            if not keys:
+                return None
+            key = keys[int(hashlib.sha1(day.encode()).hexdigest(), 16) % len(keys)]
+            return self._entry(key)
+
+    def untranslated(self, limit):
+        with self._lock:
+            self._load_file()
+            return [self._entry(k) for k, q in self.data["quotes"].items() if not q.get("zh")][:limit]
+
+    def add(self, quote, author, zh=None, day=None):
+        """加入一句名言，day 不为空时同时记为当天的名言；返回 key"""
+        key = quote_key(quote)
+
+        def change():
+            entry = self.data["quotes"].setdefault(key, {"q": quote, "a": author})
+            if zh:
+                entry["zh"] = zh
+            if day:
+                self.data["days"][day] = key
+
+        with self._lock:
+            self._update(change)
+        return key
+
+    def set_translation(self, key, zh):
+        def change():
+            if key in self.data["quotes"]:
+                self.data["quotes"][key]["zh"] = zh
+
+        with self._lock:
+            self._update(change)
+
+    def add_bulk(self, quotes, day):
+        """批量加入 [(名言, 作者)] 并记下批量预取的日期，只写一次文件；返回新加入的条数"""
+        def change():
+            added = 0
+            for quote, author in quotes:
+                key = quote_key(quote)
+                if key not in self.data["quotes"]:
+                    self.data["quotes"][key] = {"q": quote, "a": author}
+                    added += 1
+            self.data["bulk_day"] = day
+            return added
+
+        with self._lock:
+            return self._update(change)
+
+    def bulk_day(self):
+        with self._lock:
+            self._load_file()
+            return self.data.get("bulk_day")
+
+    def _entry(self, key):
+        entry = self.data["quotes"].get(key) if key else None
+        return dict(entry, key=key) if entry else None
+
+    def _prune(self):
+        # 超出上限时删除最早加入、且不是某天名言的条目
+        quotes = self.data["quotes"]
+        if len(quotes) <= self.max_quotes:
+            return
+        pinned = set(self.data["days"].values())
+        for key in [k for k in quotes if k not in pinned][:len(quotes) - self.max_quotes]:
+            del quotes[key]
+
+    def _load_file(self):
+        if self._file is not None:
+            self._use(self._file.load())
+
+    def _use(self, data):
+        if isinstance(data, dict):
+            self.data = {"quotes": data.get("quotes", {}), "days": data.get("days", {}),
+                         "bulk_day": data.get("bulk_day")}
+
+    def _update(self, change):
+        """调用方持有 self._lock。在文件锁内读出最新的语料库，change() 修改 self.data 后写回，
+        后台预取和 cron 里的推送同时写入时不会丢掉对方的修改；返回 change() 的结果
+        """
+        result = None
+
+        def merge(data):
+            nonlocal result
+            self._use(data)
+            result = change()
+            self._prune()
+            return self.data
+
+        if self._file is None:
+            merge(None)
+            return result
+        try:
+            self._file.update(merge)
+        except OSError as e:
+            print(f"写入名言语料库失败: {e}")
+        return result
+
+
+_corpus = None
+_corpus_lock = threading.Lock()
+
+
+def get_corpus():
+    """进程内共享的语料库，文件位置可用 QUOTE_CORPUS 环境变量覆盖"""
+    global _corpus
+    if _corpus is None:
+        with _corpus_lock:
+            if _corpus is None:
+                _corpus = QuoteCorpus(os.getenv("QUOTE_CORPUS", QUOTE_CORPUS_FILE))
+    return _corpus
+
+
+# ===================== 抓取 =====================
+def _fetch(url, timeout=FETCH_TIMEOUT):
+    res = http_client.get(url, timeout=timeout, retry=False)
+    res.raise_for_status()
+    data = res.json()
+    # 被限流时 zenquotes 返回一条作者为 zenquotes.io 的提示
+    quotes = [(item["q"], item["a"]) for item in data if item.get("a") != "zenquotes.io"]
+    if not quotes:
+        raise RuntimeError(data[0].get("q") if data else "zenquotes 返回为空")
+    return quotes
+
 
 def get_daily_quote():
+    """直接请求 zenquotes 的今日名言，失败时返回 (None, None)"""
     try:
-        # 从 ZenQuotes 获取每日一句
-        response = requests.get("https://zenquotes.io/api/today")
-        data = response.json()
-        quote = data[0]["q"]
-        author = data[0]["a"]
-        return quote, author
+        return _fetch(ZENQUOTES_TODAY)[0]
     except Exception as e:
         print(f"获取每日名言失败: {e}")
         return None, None
 
+
 def translate_to_chinese(text):
-    try:
-        # 使用 MyMemory 免费翻译 API（无需注册）
-        url = "https://api.mymemory.translated.net/get"
-        params = {"q": text, "langpair": "en|zh-CN"}
-        response = requests.get(url, params=params)
-        data = response.json()
-        translation = data["responseData"]["translatedText"]
-        return translation
-    except Exception as e:
-        print(f"翻译失败: {e}")
-        return "（翻译失败）"
+    # 按原文缓存翻译结果，同一句话不重复请求 MyMemory；请求失败时返回提示文字
+    return translate(text, "en|zh-CN", fallback="（翻译失败）")
+
+
+def prefetch(day=None, bulk=True):
+    """预取当天名言及译文；bulk 为真时每天额外拉一次批量名言充实语料库，并补译几条旧名言"""
+    day = day or date.today().isoformat()
+    corpus = get_corpus()
+    entry = corpus.for_day(day)
+    if entry is None:
+        quote, author = _fetch(ZENQUOTES_TODAY)[0]
+        corpus.add(quote, author, day=day)
+        entry = corpus.for_day(day)
+    if not entry.get("zh"):
+        zh = translate(entry["q"], "en|zh-CN")
+        if zh:
+            corpus.set_translation(entry["key"], zh)
+    if not bulk:
+        return corpus.for_day(day)
+    if corpus.bulk_day() != day:
+        corpus.add_bulk(_fetch(ZENQUOTES_BULK), day)
+    for old in corpus.untranslated(BULK_TRANSLATE):
+        zh = translate(old["q"], "en|zh-CN")
+        if not zh:
+            break
+        corpus.set_translation(old["key"], zh)
+    return corpus.for_day(day)
+
+
+def daily_quote(day=None, fetch=True):
+    """今天的名言 (英文, 作者, 译文)，语料库中已有且已翻译时不联网
+    没有预取到名言或译文时现取一次（翻译有缓存、超时有上限）；仍然失败时从语料库中挑一句已翻译的
+    旧名言；语料库为空时返回 (None, None, None)
+    """
+    day = day or date.today().isoformat()
+    corpus = get_corpus()
+    entry = corpus.for_day(day)
+    if fetch and (entry is None or not entry.get("zh")):
+        # 当天名言已入库但翻译失败过：cron 推送没有常驻的预取线程重试，每次推送都再翻译一次
+        try:
+            entry = prefetch(day, bulk=False)
+        except Exception as e:
+            print(f"获取每日名言失败: {e}")
+    if entry is None or not entry.get("zh"):
+        fallback = corpus.fallback(day)
+        if entry is None or (fallback and fallback.get("zh")):
+            entry = fallback
+    if entry is None:
+        return None, None, None
+    return entry["q"], entry["a"], entry.get("zh")
+
+
+def start_prefetcher(interval=PREFETCH_INTERVAL):
+    """后台线程：启动时预取一次，之后每隔 interval 秒检查一次，跨天时预取新的名言"""
+    def run():
+        while True:
+            try:
+                prefetch()
+            except Exception as e:
+                print(f"预取每日名言失败: {e}")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=run, name="quote-prefetch", daemon=True)
+    thread.start()
+    return thread
+
 
 def main():
-    quote, author = get_daily_quote()
+    quote, author, translation = daily_quote()
     if not quote:
         return
 
-    translation = translate_to_chinese(quote)
+    translation = translation or translate_to_chinese(quote)
 
     print(f"🌞 每日一句 | {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("──────────────────────────────")
@@ -41,5 +272,13 @@ def main():
     print("──────────────────────────────")
 
 if __name__ == "__main__":
-    main()
-
+    import argparse
+    parser = argparse.ArgumentParser(description="每日一句")
+    parser.add_argument("--prefetch", action="store_true", help="只预取当天名言及译文到语料库（适合 cron）")
+    parser.add_argument("--no-bulk", action="store_true", help="预取时不请求批量名言接口")
+    args = parser.parse_args()
+    if args.prefetch:
+        entry = prefetch(bulk=not args.no_bulk)
+        print(f"已预取: {entry['q']} —— {entry['a']}  译文: {entry.get('zh') or '无'}")
+    else:
+        main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""和风天气公共部分：JWT 签名缓存、多地区并发抓取、实时数据缓存"""
+import atexit
+import threading
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import http_client
+from json_file import JsonFile
+
+# JWT 有效期与提前重新签名的秒数
+JWT_TTL = 3600
+JWT_REFRESH_MARGIN = 300
+
+
+class JWTProvider(object):
+    """缓存已签名的 JWT，临近 exp 才重新签名；私钥只解析一次，线程间共享"""
+
+    def __init__(self, key_id, project_id, private_key, ttl=JWT_TTL, refresh_margin=JWT_REFRESH_MARGIN):
+        self.key_id = key_id
+        self.project_id = project_id
+        self.private_key = private_key
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self._key = None
+        self._token = None
+        self._exp = 0
+        self._lock = threading.Lock()
+
+    def token(self):
+        if self._token is not None and time.time() < self._exp - self.refresh_margin:
+            return self._token
+        with self._lock:
+            now = int(time.time())
+            if self._token is not None and now < self._exp - self.refresh_margin:
+                return self._token
+            # pyjwt + cryptography 导入要近 90 ms，只在需要签名时导入；天气缓存新鲜时整个运行都用不到
+            import jwt  # pip install pyjwt
+            from cryptography.hazmat.primitives.serialization import load_pem_private_key
+
+            if self._key is None:
+                # PEM 格式 Ed25519 私钥
+                self._key = load_pem_private_key(self.private_key.encode(), password=None)
+            payload = {"sub": self.project_id, "iat": now, "exp": now + self.ttl}
+            headers = {"alg": "EdDSA", "kid": self.key_id}
+            self._token = jwt.encode(payload, self._key, algorithm="EdDSA", headers=headers)
+            self._exp = now + self.ttl
+            return self._token
+
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def get_jwt_provider(key_id, project_id, private_key):
+    """同一进程内按凭据共享 JWTProvider"""
+    with _providers_lock:
+        provider = _providers.get((key_id, project_id, private_key))
+        if provider is None:
+            provider = JWTProvider(key_id, project_id, private_key)
+            _providers[(key_id, project_id, private_key)] = provider
+        return provider
+
+
+# ===================== 实时数据 =====================
+WEATHER_NOW = "weather/now"
+AIR_NOW = "air/now"
+WEATHER_WORKERS = 4
+
+
+def fetch_now(api_host, endpoint, location, token, timeout=10):
+    url = f"https://{api_host}/v7/{endpoint}?location={location}&gzip=true&lang=zh"
+    return http_client.get(url, headers={"Authorization": f"Bearer {token}"}, timeout=timeout).json()
+
+
+# 数据源的更新周期（秒）：实时天气约 10 分钟一更，空气质量按小时更新
+UPDATE_INTERVAL = {WEATHER_NOW: 600, AIR_NOW: 3600}
+# 缓存最短有效期：updateTime 推算的下一次更新已过时，至少隔这么久再请求
+MIN_TTL = 60
+# 过期后仍可直接返回旧数据（同时后台刷新）的时长
+STALE_WINDOW = 2 * 3600
+# 进程退出时最多等待后台刷新的秒数：一次性的推送脚本不会被刷新拖住，来得及完成的刷新仍会落盘给下次用
+REFRESH_EXIT_WAIT = 2
+
+_refresh_threads = set()
+
+
+@atexit.register
+def _wait_refreshes(timeout=REFRESH_EXIT_WAIT):
+    # 后台刷新是守护线程，退出时只等到截止时间为止
+    deadline = time.monotonic() + timeout
+    for thread in list(_refresh_threads):
+        thread.join(max(0, deadline - time.monotonic()))
+
+
+class ResponseCache(object):
+    """按 endpoint+地区 缓存实时数据，支持 stale-while-revalidate，可落盘供多个进程共用
+
+    新鲜期由返回数据里的 updateTime 加上该接口的更新周期推算；
+    过期但在 STALE_WINDOW 内直接返回旧数据并在后台刷新；再旧的同步重新请求。
+    """
+
+    def __init__(self, path=None, update_interval=UPDATE_INTERVAL, min_ttl=MIN_TTL, stale_window=STALE_WINDOW):
+        self.path = path
+        self.update_interval = update_interval
+        self.min_ttl = min_ttl
+        self.stale_window = stale_window
+        self._entries = {}
+        self._file = JsonFile(path) if path else None
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def fresh(self, endpoint, location):
+        """新鲜期内直接返回缓存数据，否则返回 None"""
+        entry = self._entry(f"{endpoint}:{location}")
+        if entry is not None and time.time() < entry["fresh_until"]:
+            return entry["data"]
+        return None
+
+    def get(self, endpoint, location, fetch):
+        """fetch 为无参函数，返回接口 json"""
+        key = f"{endpoint}:{location}"
+        entry = self._entry(key)
+        now = time.time()
+        if entry is not None:
+            if now < entry["fresh_until"]:
+                return entry["data"]
+            if now < entry["fresh_until"] + self.stale_window:
+                self._refresh_async(key, endpoint, fetch)
+                return entry["data"]
+        return self._refresh(key, endpoint, fetch)
+
+    def _entry(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() >= entry["fresh_until"]:
+                # 没有或已过期：看看别的推送脚本是否刚请求过同一地区
+                self._load_file()
+                entry = self._entries.get(key)
+            return entry
+
+    def _refresh(self, key, endpoint, fetch):
+        data = fetch()
+        if data.get("code") != "200":
+            # 错误响应不缓存
+            return data
+        fetched_at = time.time()
+        interval = self.update_interval.get(endpoint, self.min_ttl)
+        fresh_until = fetched_at + interval
+        try:
+            updated = datetime.fromisoformat(data["updateTime"]).timestamp()
+            fresh_until = min(fresh_until, updated + interval)
+        except (KeyError, TypeError, ValueError):
+            pass
+        entry = {"data": data, "fetched_at": fetched_at, "fresh_until": max(fresh_until, fetched_at + self.min_ttl)}
+        with self._lock:
+            self._entries[key] = entry
+            self._save_file()
+        return data
+
+    def _refresh_async(self, key, endpoint, fetch):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self._refresh(key, endpoint, fetch)
+            except Exception as e:
+                print(f"后台刷新 {key} 失败: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+                _refresh_threads.discard(threading.current_thread())
+
+        thread = threading.Thread(target=run, name=f"refresh-{key}", daemon=True)
+        _refresh_threads.add(thread)
+        thread.start()
+
+    def _load_file(self):
+        if self._file is not None:
+            self._merge(self._file.load())
+
+    def _merge(self, entries):
+        """并入文件中的条目，同一 key 保留 fetched_at 较新的；返回合并后的全部条目"""
+        for key, entry in (entries or {}).items():
+            current = self._entries.get(key)
+            if current is None or entry.get("fetched_at", 0) > current["fetched_at"]:
+                self._entries[key] = entry
+        return self._entries
+
+    def _save_file(self):
+        if self._file is None:
+            return
+        try:
+            # 文件锁内先并入其他进程写入的条目再写回，不会覆盖它们刚刷新的数据
+            self._file.update(self._merge)
+        except OSError as e:
+            print(f"写入天气缓存失败: {e}")
+
+
+def fetch_locations(api_host, locations, jwt_provider, endpoints=(WEATHER_NOW, AIR_NOW), max_workers=WEATHER_WORKERS,
+                    cache=None):
+    """并发抓取多个地区的实时数据，共用同一个 JWT 和连接池
+    @param locations: 地区代码列表
+    @param cache: 可选的 ResponseCache，新鲜数据不再发请求
+    @return: {地区代码: {endpoint: 返回的 json，失败时为异常对象}}
+    """
+    results = {location: {} for location in locations}
+    tasks = []
+    for location in locations:
+        for endpoint in endpoints:
+            data = cache.fresh(endpoint, location) if cache is not None else None
+            if data is not None:
+                results[location][endpoint] = data
+            else:
+                tasks.append((location, endpoint))
+    if not tasks:
+        return results
+
+    def fetch(location, endpoint):
+        # 后台刷新时 token 可能已过期，每次都从 provider 取
+        return fetch_now(api_host, endpoint, location, jwt_provider.token())
+
+    def task(location, endpoint):
+        if cache is None:
+            return fetch(location, endpoint)
+        return cache.get(endpoint, location, lambda: fetch(location, endpoint))
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as pool:
+        futures = {pool.submit(task, location, endpoint): (location, endpoint)
+                   for location, endpoint in tasks}
+        for future in as_completed(futures):
+            location, endpoint = futures[future]
+            try:
+                results[location][endpoint] = future.result()
+            except Exception as e:
+                results[location][endpoint] = e
+    return results
@@ -1,140 +1,84 @@
-import json
-import random
-from datetime import datetime
-import requests
-import os
-import re
+import sys
 from dotenv import load_dotenv
+from delivery import push
+from question_store import open_store, random_question
+from question_render import RENDERERS, RENDER_VERSION, render_sat, sat_header, sat_message
+from question_scheduler import QuestionScheduler
 
 # 配置
 
 # 本地题库文件路径
 QUESTION_FILE = "/home/learning/questions.json"
+# 题库索引文件（含预渲染好的题目），由 question_render.py 生成
+QUESTION_STORE = "/home/learning/questions.qbin"
+# 出题进度文件，保证一轮内不重复
+SCHEDULE_STATE = "/home/learning/question_state.json"
 
 # 读取 .env 配置
 load_dotenv()
-TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
-TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
-WX_CORP_ID = os.getenv("WX_CORP_ID")
-WX_AGENT_ID = os.getenv("WX_AGENT_ID")
-WX_SECRET = os.getenv("WX_SECRET")
 
 # 开关：是否对 LaTeX 进行文本化处理
 USE_LATEX_TEXT = True
 
 
-def latex_to_text(s: str) -> str:
-    """将 LaTeX 表达式转换为可读文本形式，可扩展"""
-    if not isinstance(s, str):
-        return s
-    # 分式: \frac{a}{b} -> a/b
-    s = re.sub(r"\\frac\{([^}]*)\}\{([^}]*)\}", r"\1/\2", s)
-    # 括号替换
-    s = s.replace(r"\left(", "(").replace(r"\right)", ")")
-    # 行内/块公式标记移除
-    s = re.sub(r"\$\$(.*?)\$\$", r"\1", s)
-    s = re.sub(r"\$(.*?)\$", r"\1", s)
-    # 根号 sqrt
-    s = re.sub(r"\\sqrt\{([^}]*)\}", r"sqrt(\1)", s)
-    # 乘号
-    s = s.replace(r"\cdot", "*").replace(r"\times", "*")
-    # 常见关系符号
-    s = s.replace(r"\le", "<=").replace(r"\ge", ">=")
-    s = s.replace(r"\neq", "!=").replace(r"\approx", "approx")
-    # 常用希腊字母
-    s = s.replace(r"\pi", "pi")
-    # 分隔符处理
-    s = s.replace(r"\,", " ").replace(r"\;", " ")
-    # 去除多余反斜杠
-    s = s.replace("\\", "")
-    return s
-
 # 数据加载与随机抽题
 def load_questions():
-    """加载本地 JSON 文件"""
-    with open(QUESTION_FILE, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    all_questions = []
-    # 支持多类型题库，如 math、reading、writing 等
-    for category, questions in data.items():
-        all_questions.extend(questions)
-    return all_questions
+    """打开题库索引文件（不存在、过期或缺少预渲染时自动由 JSON 生成）
+    支持多类型题库，如 math、reading、writing 等；抽题时只读取选中的一条
+    """
+    return open_store(QUESTION_FILE, QUESTION_STORE, RENDERERS, RENDER_VERSION)
+
+question_scheduler = QuestionScheduler(SCHEDULE_STATE)
 
 def pick_random_question(questions):
-    """随机选一道题"""
-    return random.choice(questions)
+    """随机选一道题的下标：按持久化的随机排列依次出题，一轮内不重复"""
+    return question_scheduler.next_index(len(questions))
+
+def pick_filtered_question(questions, query):
+    """按 "hard algebra" 这类条件（难度/分类/domain）抽题，返回下标，没有匹配时返回 None"""
+    return questions.sample(**questions.parse_query(query))
 
 # 显示题目（文本化处理）
 def display_question(q):
-    """美观地显示题目、选项和解析"""
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    question_raw = q["question"]["question"]
-    choices_raw = q["question"]["choices"]  # 预计为字典 {"A": "...", "B": "...", ...}
-    explanation_raw = q["question"]["explanation"]
-    domain = q.get("domain", "未知分类")
-    difficulty = q.get("difficulty", "未知难度")
+    """美观地显示题目、选项和解析（现场渲染，不走预渲染结果）"""
+    return sat_header() + render_sat(q, latex=USE_LATEX_TEXT)
 
+def question_message(questions, i):
+    """第 i 题的推送消息：预渲染好的正文加上时间戳，按渠道区分"""
     if USE_LATEX_TEXT:
-        question = latex_to_text(question_raw)
-        choices = {k: latex_to_text(v) for k, v in choices_raw.items()}
-        explanation = latex_to_text(explanation_raw)
+        return sat_message(questions, i)
+    return display_question(questions[i])
+
+def question_for(query=None):
+    """按条件或按顺序出一道题，返回推送消息"""
+    try:
+        questions = load_questions()
+    except OSError as e:
+        # 索引文件无法生成（只读目录、磁盘已满等）：流式扫描 JSON 随机抽一题，内存占用与题库大小无关
+        print("⚠️ 题库索引不可用，直接从 JSON 抽题:", e)
+        picked = random_question(QUESTION_FILE)
+        return display_question(picked[1]) if picked else "📘 SAT 每日一题: 题库为空\n"
+    if query:
+        i = pick_filtered_question(questions, query)
     else:
-        question = question_raw
-        choices = choices_raw
-        explanation = explanation_raw
-
-    correct = q["question"]["correct_answer"]
-
-    msg = ""
-    msg += f"📘 SAT 每日一题  |  更新时间: {now}\n"
-    msg += "=" * 27 + "\n"
-    msg += f"📚 分类: {domain}   \n💡 难度: {difficulty}\n"
-    msg += "-" * 52 + "\n"
-    msg += f"📝 题目：\n{question}\n"
-    for key in ["A", "B", "C", "D"]:
-        val = choices.get(key, "")
-        msg += f"  {key}. {val}\n"
-    msg += "-" * 52 + "\n"
-    msg += f"✅ 正确答案: {correct}\n"
-    msg += f"🧩 解析: {explanation}\n"
-    msg += ""
-    return msg
-
-# 发送机制
-def send_telegram(msg):
-    """通过 Telegram 发送消息"""
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-    requests.get(url, params={"chat_id": TELEGRAM_CHAT_ID, "text": msg})
-
-def send_wechat(msg):
-    """通过企业微信发送消息"""
-    token_url = f"https://qyapi.weixin.qq.com/cgi-bin/gettoken?corpid={WX_CORP_ID}&corpsecret={WX_SECRET}"
-    r = requests.get(token_url).json()
-    access_token = r.get("access_token")
-    if not access_token:
-        print("❌ 企业微信获取 access_token 失败")
-        return
-    send_url = f"https://qyapi.weixin.qq.com/cgi-bin/message/send?access_token={access_token}"
-    data = {
-        "touser": "@all",
-        "msgtype": "text",
-        "agentid": int(WX_AGENT_ID),
-        "text": {"content": msg},
-        "safe": 0
-    }
-    requests.post(send_url, json=data)
+        i = pick_random_question(questions)
+    if i is None:
+        return f"📘 SAT 每日一题: 没有符合「{query}」的题目\n"
+    return question_message(questions, i)
 
 # 主执行入口
-if __name__ == "__main__":
+def main(query=None):
     try:
-        questions = load_questions()
-        q = pick_random_question(questions)
-        msg = display_question(q)
+        msg = question_for(query)
 
-        print(msg)
+        print(msg if isinstance(msg, str) else msg["default"])
 
-        send_telegram(msg)
-        send_wechat(msg)
+        push(msg)
 
     except Exception as e:
         print("❌ 出错了:", e)
+
+
+if __name__ == "__main__":
+    # 可选筛选条件，例如: python3 sat.py hard algebra
+    main(" ".join(sys.argv[1:]) or None)
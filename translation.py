@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""翻译缓存：MyMemory 翻译结果按 (语言对, 原文) 的哈希持久化缓存
+
+zenquotes 的 today 接口一整天返回同一句话，重复的推送不再请求翻译，也不消耗
+MyMemory 每日的免费字数。查找顺序：
+  1. 缓存文件（LRU，按条数和总字节数限制大小，多个进程共用）
+  2. 本地预置词典 TRANSLATION_SEED_FILE（{"原文": "译文"} 的 JSON，语言对为 en|zh-CN；
+     也可以写成 {"语言对": {"原文": "译文"}}），只读，不会被淘汰
+  3. 请求 MyMemory：不重试、超时有上限，失败时返回调用方给的 fallback，失败结果不缓存
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import http_client
+from json_file import JsonFile
+
+MYMEMORY_URL = "https://api.mymemory.translated.net/get"
+DEFAULT_LANGPAIR = "en|zh-CN"
+TRANSLATION_CACHE_FILE = "/home/learning/translations.json"
+TRANSLATION_SEED_FILE = "/home/learning/translations_seed.json"
+# (连接超时, 读取超时)，翻译失败时推送里显示 fallback，不拖慢整条推送
+TRANSLATE_TIMEOUT = (3, 5)
+MAX_ENTRIES = 2000
+MAX_BYTES = 1 << 20
+
+
+def cache_key(text, langpair=DEFAULT_LANGPAIR):
+    return hashlib.sha1(f"{langpair}\0{text.strip()}".encode("utf-8")).hexdigest()
+
+
+class TranslationCache(object):
+    """key -> 译文，超出 max_entries 条或 max_bytes 字节时淘汰最久未用的"""
+
+    def __init__(self, path=None, seed_path=None, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.path = path
+        self.seed_path = seed_path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._file = JsonFile(path) if path else None
+        self._seed = None
+        self._lock = threading.Lock()
+
+    def get(self, text, langpair=DEFAULT_LANGPAIR):
+        key = cache_key(text, langpair)
+        with self._lock:
+            if key not in self._entries:
+                # 其他进程可能已经翻译过
+                self._load_file()
+            translation = self._entries.get(key)
+            if translation is not None:
+                self._entries.move_to_end(key)
+                return translation
+            return self._load_seed().get(key)
+
+    def put(self, text, langpair, translation):
+        key = cache_key(text, langpair)
+        with self._lock:
+            self._set(key, translation)
+            self._save_file()
+
+    def _set(self, key, translation):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= _size(key, old)
+        self._entries[key] = translation
+        self._bytes += _size(key, translation)
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            old_key, old = self._entries.popitem(last=False)
+            self._bytes -= _size(old_key, old)
+
+    def _load_seed(self):
+        if self._seed is None:
+            self._seed = {}
+            if self.seed_path:
+                try:
+                    with open(self.seed_path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                except FileNotFoundError:
+                    data = {}
+                except (OSError, ValueError) as e:
+                    print(f"读取翻译词典失败: {e}")
+                    data = {}
+                for source, value in data.items():
+                    if isinstance(value, dict):
+                        for text, translation in value.items():
+                            self._seed[cache_key(text, source)] = translation
+                    else:
+                        self._seed[cache_key(source)] = value
+        return self._seed
+
+    def _load_file(self):
+        if self._file is not None:
+            self._merge(self._file.load())
+
+    def _merge(self, entries):
+        """并入文件中的条目并重新按大小限制淘汰；返回合并后的全部条目"""
+        if not entries:
+            return self._entries
+        # 文件中按最久未用到最近使用排列，本进程较新的条目放在后面
+        merged = OrderedDict((k, v) for k, v in entries.items() if k not in self._entries)
+        merged.update(self._entries)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        for key, translation in merged.items():
+            self._set(key, translation)
+        return self._entries
+
+    def _save_file(self):
+        if self._file is None:
+            return
+        try:
+            # 文件锁内先并入其他进程刚缓存的译文再写回
+            self._file.update(self._merge)
+        except OSError as e:
+            print(f"写入翻译缓存失败: {e}")
+
+
+def _size(key, translation):
+    return len(key) + len(translation.encode("utf-8"))
+
+
+def fetch_translation(text, langpair=DEFAULT_LANGPAIR, timeout=TRANSLATE_TIMEOUT):
+    """请求 MyMemory；超额、报错时抛异常"""
+    res = http_client.get(MYMEMORY_URL, params={"q": text, "langpair": langpair}, timeout=timeout, retry=False)
+    data = res.json()
+    # 超出每日额度时 responseStatus 为 403/429，translatedText 是提示文字，不能当译文缓存
+    if str(data.get("responseStatus")) != "200":
+        raise RuntimeError(f"{data.get('responseStatus')} {data.get('responseDetails')}")
+    return data["responseData"]["translatedText"]
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """进程内共享的缓存，文件位置可用 TRANSLATION_CACHE / TRANSLATION_SEED 环境变量覆盖"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TranslationCache(os.getenv("TRANSLATION_CACHE", TRANSLATION_CACHE_FILE),
+                                          os.getenv("TRANSLATION_SEED", TRANSLATION_SEED_FILE))
+    return _cache
+
+
+def translate(text, langpair=DEFAULT_LANGPAIR, fallback=None, timeout=TRANSLATE_TIMEOUT):
+    """翻译 text，命中缓存或词典时不发请求；请求失败返回 fallback"""
+    if not text:
+        return fallback
+    cache = get_cache()
+    translation = cache.get(text, langpair)
+    if translation is not None:
+        return translation
+    try:
+        translation = fetch_translation(text, langpair, timeout)
+    except Exception as e:
+        print(f"翻译失败: {e}")
+        return fallback
+    cache.put(text, langpair, translation)
+    return translation
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""企业微信 access_token 缓存
+
+access_token 有效期 7200 秒，且 gettoken 接口有频率限制。这里按 corpid+secret
+缓存 token，临近过期才刷新：
+  - 同一进程内并发调用只会触发一次刷新（single-flight）
+  - 可选落盘缓存，多个脚本进程共用同一个 token，刷新时用文件锁互斥
+"""
+import hashlib
+import os
+import threading
+import time
+
+import http_client
+from json_file import JsonFile
+
+TOKEN_URL = "https://qyapi.weixin.qq.com/cgi-bin/gettoken"
+SEND_URL = "https://qyapi.weixin.qq.com/cgi-bin/message/send"
+# 默认落盘缓存路径，可用环境变量 WX_TOKEN_CACHE 覆盖，设为空字符串关闭
+TOKEN_CACHE_FILE = "/home/learning/.wx_access_token.json"
+# 提前刷新的秒数
+REFRESH_MARGIN = 300
+# 表示 token 失效、需要重新获取的错误码
+TOKEN_EXPIRED_ERRCODES = (40001, 40014, 42001)
+
+
+class AccessTokenCache(object):
+    """单个 corpid+secret 的 access_token 缓存"""
+
+    def __init__(self, corp_id, secret, cache_file=None, margin=REFRESH_MARGIN):
+        self.corp_id = corp_id
+        self.secret = secret
+        self.cache_file = cache_file
+        # token 文件只允许本用户读写
+        self._file = JsonFile(cache_file, mode=0o600) if cache_file else None
+        self.margin = margin
+        # 落盘时不保存 secret，只用摘要区分不同应用
+        self.cache_key = hashlib.sha1(f"{corp_id}:{secret}".encode()).hexdigest()
+        self._token = None
+        self._expires_at = 0
+        # 最近一次被作废的 token，避免从落盘缓存里再次读回
+        self._stale = None
+        self._lock = threading.Lock()
+
+    def get(self, force_refresh=False):
+        """返回有效的 access_token，获取失败返回 None"""
+        if not force_refresh and self._valid():
+            return self._token
+        with self._lock:
+            # 等锁期间其他线程可能已经刷新过
+            if not force_refresh and self._valid():
+                return self._token
+            if not force_refresh and self._load_file():
+                return self._token
+            return self._refresh()
+
+    def invalidate(self, token=None):
+        """接口返回 token 失效时调用；只在缓存的仍是该 token 时清除"""
+        with self._lock:
+            if token is None or token == self._token:
+                self._stale = self._token
+                self._token = None
+                self._expires_at = 0
+
+    def _valid(self):
+        return self._token is not None and time.time() < self._expires_at - self.margin
+
+    def _load_file(self, force=False):
+        """文件里有其他进程刷新的有效 token 时载入；force 为假时文件没变化就不读"""
+        if self._file is None:
+            return False
+        data = self._file.load(force)
+        entry = data.get(self.cache_key) if isinstance(data, dict) else None
+        if not entry or entry.get("access_token") in (self._token, self._stale):
+            # 文件里还是内存中已有或刚被作废的 token
+            return False
+        self._token = entry.get("access_token")
+        self._expires_at = entry.get("expires_at", 0)
+        return self._valid()
+
+    def _save_file(self):
+        # 调用方已持有文件锁，这里读出最新内容只改自己这一项，不覆盖其他应用的 token
+        if self._file is None:
+            return
+        data = self._file.load(force=True)
+        if not isinstance(data, dict):
+            data = {}
+        data[self.cache_key] = {"access_token": self._token, "expires_at": self._expires_at}
+        try:
+            self._file.save(data)
+        except OSError as e:
+            print(f"写入 access_token 缓存失败: {e}")
+
+    def _refresh(self):
+        if self._file is None:
+            return self._fetch()
+        with self._file.lock():
+            # 拿到文件锁后再看一次，其他进程可能刚刷新完
+            if self._load_file(force=True):
+                return self._token
+            return self._fetch()
+
+    def _fetch(self):
+        params = {"corpid": self.corp_id, "corpsecret": self.secret}
+        r = http_client.get(TOKEN_URL, params=params).json()
+        token = r.get("access_token")
+        if not token:
+            print(f"企业微信获取access_token失败: {r.get('errcode')} {r.get('errmsg')}")
+            return None
+        self._token = token
+        self._expires_at = time.time() + int(r.get("expires_in", 7200))
+        self._save_file()
+        return token
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_token_cache(corp_id, secret):
+    """同一进程内按 corpid+secret 共享缓存实例"""
+    with _caches_lock:
+        cache = _caches.get((corp_id, secret))
+        if cache is None:
+            cache_file = os.getenv("WX_TOKEN_CACHE", TOKEN_CACHE_FILE)
+            cache = AccessTokenCache(corp_id, secret, cache_file=cache_file or None)
+            _caches[(corp_id, secret)] = cache
+        return cache
+
+
+def get_access_token(corp_id, secret, force_refresh=False):
+    return get_token_cache(corp_id, secret).get(force_refresh)
+
+
+def invalidate_access_token(corp_id, secret, token=None):
+    get_token_cache(corp_id, secret).invalidate(token)
+
+
+def send_app_message(corp_id, secret, data, timeout=None):
+    """用缓存的 access_token 发送应用消息；token 被提前作废时刷新并重试一次
+    @return: 接口返回的 json，获取 token 失败返回 None
+    """
+    cache = get_token_cache(corp_id, secret)
+    for _ in range(2):
+        access_token = cache.get()
+        if not access_token:
+            return None
+        kwargs = {"timeout": timeout} if timeout else {}
+        r = http_client.post(SEND_URL, params={"access_token": access_token}, json=data, **kwargs).json()
+        if r.get("errcode") not in TOKEN_EXPIRED_ERRCODES:
+            return r
+        cache.invalidate(access_token)
+    return r